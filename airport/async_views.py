@@ -0,0 +1,106 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.shortcuts import aget_object_or_404
+from drf_spectacular.utils import extend_schema
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+
+from airport.cache import flight_list_cache
+from airport.filters import filter_flights
+from airport.pagination import AsyncFlightCursorPagination, AsyncLimitOffsetPagination
+from airport.serializers import (
+    AirportSerializer,
+    FlightDetailSerializer,
+    FlightListSerializer,
+    RouteListSerializer,
+)
+from airport.views import AirportViewSet, FlightViewSet, RouteViewSet
+
+
+class AsyncAPIView(GenericAPIView):
+    """GenericAPIView with coroutine handlers, for serving under ASGI.
+
+    Authentication, permissions and throttling run as in DRF, in a worker
+    thread. Handlers query through the async ORM and serialize in the event
+    loop, so every relation a serializer touches must be fetched up front.
+    """
+
+    pagination_class = AsyncLimitOffsetPagination
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = self.http_method_not_allowed
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), handler)
+            if not iscoroutinefunction(handler):
+                handler = sync_to_async(handler)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def alist(self, queryset):
+        page = await self.paginator.apaginate_queryset(queryset, self.request, self)
+        if page is None:
+            page = [obj async for obj in queryset.aiterator()]
+            return Response(self.get_serializer(page, many=True).data)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+
+class AirportListView(AsyncAPIView):
+    queryset = AirportViewSet.queryset
+    serializer_class = AirportSerializer
+
+    @extend_schema(responses=AirportSerializer(many=True))
+    async def get(self, request):
+        """Airport list, served by the async ORM"""
+        return await self.alist(self.get_queryset())
+
+
+class RouteListView(AsyncAPIView):
+    queryset = RouteViewSet.queryset
+    serializer_class = RouteListSerializer
+
+    @extend_schema(responses=RouteListSerializer(many=True))
+    async def get(self, request):
+        """Route list, served by the async ORM"""
+        return await self.alist(self.get_queryset())
+
+
+class FlightListView(AsyncAPIView):
+    queryset = FlightViewSet.queryset
+    serializer_class = FlightListSerializer
+    pagination_class = AsyncFlightCursorPagination
+
+    @extend_schema(responses=FlightListSerializer(many=True))
+    async def get(self, request):
+        """Flight list served by the async ORM, takes the filters of the
+        flight list and shares its page cache"""
+        data, generations = await sync_to_async(flight_list_cache.get)(request)
+        if data is not None:
+            return Response(data)
+        # Resolving source and destination may build the airport index
+        queryset = await sync_to_async(filter_flights)(
+            self.get_queryset(), request.query_params
+        )
+        response = await self.alist(queryset)
+        await sync_to_async(flight_list_cache.set)(request, response.data, generations)
+        return response
+
+
+class FlightDetailView(AsyncAPIView):
+    queryset = FlightViewSet.queryset.prefetch_related("tickets")
+    serializer_class = FlightDetailSerializer
+
+    async def get(self, request, pk):
+        """Flight detail, served by the async ORM"""
+        flight = await aget_object_or_404(self.get_queryset(), pk=pk)
+        return Response(self.get_serializer(flight).data)
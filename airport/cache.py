@@ -0,0 +1,207 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from airport.replicas import reading_from_primary
+
+GENERATION_KEY = "generation:{}"
+
+
+def get_generations(names):
+    keys = [GENERATION_KEY.format(name) for name in names]
+    found = cache.get_many(keys)
+    return {name: found.get(key) for name, key in zip(names, keys)}
+
+
+def bump_generation(name):
+    """Invalidate everything cached against ``name``.
+
+    A missing generation is (re)started from the current time, so an evicted
+    counter never falls back to a value an old entry was stored with. The
+    bump is repeated on commit, which drops entries that concurrent readers
+    cached from the pre-commit state in the meantime.
+    """
+
+    def bump():
+        key = GENERATION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def current_generation(name):
+    """Generation of ``name``, started when it is missing."""
+    key = GENERATION_KEY.format(name)
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def flight_tag(flight_id):
+    return f"flight:{flight_id}"
+
+
+# Bumped along with every flight tag. The flights of a page are only known
+# once it was queried, too late to read their tags, this is read before.
+FLIGHT_TAGS = "flight-tags"
+
+
+def bump_flight_tag(flight_id):
+    bump_generation(flight_tag(flight_id))
+    bump_generation(FLIGHT_TAGS)
+
+
+class FlightListCache:
+    """Cache of rendered flight list pages.
+
+    An entry remembers the generations it was built against: ``flights``
+    (flight, route, airport or airplane writes), one tag per listed flight
+    (seats sold on it) and ``flight-seats`` when the page was filtered by
+    available seats (seats released on any flight). It is served only while
+    all of them are unchanged. A page is not stored when any of them,
+    including ``flight-tags``, moved while it was being queried.
+    """
+
+    KEY_PREFIX = "flight-list"
+    STATS_KEYS = {
+        "hits": "flight-list-stats:hits",
+        "misses": "flight-list-stats:misses",
+    }
+
+    NORMALIZED_PARAMS = ("source", "destination")
+
+    def normalize(self, name, value):
+        value = value.strip()
+        return value.lower() if name in self.NORMALIZED_PARAMS else value
+
+    def key(self, request):
+        params = sorted(
+            (name, self.normalize(name, value))
+            for name, values in request.query_params.lists()
+            for value in values
+        )
+        raw = repr((request.get_host(), request.path, params))
+        return f"{self.KEY_PREFIX}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+    @staticmethod
+    def global_dependencies(request):
+        names = ["flights"]
+        if request.query_params.get("min_available_seats"):
+            names.append("flight-seats")
+        return names
+
+    def dependencies(self, request, flight_ids):
+        return self.global_dependencies(request) + [
+            flight_tag(flight_id) for flight_id in flight_ids
+        ]
+
+    def _count(self, stat):
+        key = self.STATS_KEYS[stat]
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+
+    def get(self, request):
+        """Return ``(data, None)`` on a hit, else ``(None, generations)``.
+
+        The generations are read before the page is queried and have to be
+        passed to set(), which skips pages a write raced with.
+        """
+        entry = cache.get(self.key(request))
+        if entry is not None:
+            generations, data = entry
+            if get_generations(list(generations)) == generations:
+                self._count("hits")
+                return data, None
+        self._count("misses")
+        return None, get_generations(self.global_dependencies(request) + [FLIGHT_TAGS])
+
+    def set(self, request, data, generations):
+        flight_ids = [flight["id"] for flight in data["results"]]
+        current = get_generations(
+            self.dependencies(request, flight_ids) + [FLIGHT_TAGS]
+        )
+        if any(current[name] != value for name, value in generations.items()):
+            return
+        # Only a guard for the query, the entry depends on the tags themselves
+        del current[FLIGHT_TAGS]
+        cache.set(
+            self.key(request),
+            (current, data),
+            timeout=settings.FLIGHT_LIST_CACHE_TIMEOUT,
+        )
+
+    def stats(self):
+        found = cache.get_many(list(self.STATS_KEYS.values()))
+        return {stat: found.get(key, 0) for stat, key in self.STATS_KEYS.items()}
+
+
+flight_list_cache = FlightListCache()
+
+
+class LocalIndex:
+    """In-process structure rebuilt whenever its generation changes.
+
+    Reads cost a single cache lookup, every process notices writes made by
+    any other one through the shared generation counter.
+    """
+
+    def __init__(self, name, build):
+        self.name = name
+        self.build = build
+        self._generation = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        # Read before building, a write during the build triggers another one
+        generation = current_generation(self.name)
+        if generation != self._generation:
+            with self._lock:
+                if generation != self._generation:
+                    with reading_from_primary():
+                        self._value = self.build()
+                    self._generation = generation
+        return self._value
+
+
+class KeyedLocalIndex:
+    """LocalIndex holding one structure per key, e.g. per date window.
+
+    Only the ``size`` most recently used keys are kept, and all of them are
+    dropped when the generation changes.
+    """
+
+    def __init__(self, name, build, size):
+        self.name = name
+        self.build = build
+        self.size = size
+        self._generation = None
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # Read before building, a write during the build triggers another one
+        generation = current_generation(self.name)
+        with self._lock:
+            if generation != self._generation:
+                self._values.clear()
+                self._generation = generation
+            if key in self._values:
+                self._values.move_to_end(key)
+                return self._values[key]
+            with reading_from_primary():
+                value = self._values[key] = self.build(key)
+            if len(self._values) > self.size:
+                self._values.popitem(last=False)
+            return value
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import DurationField, ExpressionWrapper, F, Max
+
+from airport.cache import get_generations
+from airport.models import Crew, Flight
+
+
+def longest_flight():
+    """Duration of the longest flight, cached until flights change."""
+    generation = get_generations(["flights"])["flights"]
+    key = f"longest-flight:{generation}"
+    longest = cache.get(key)
+    if longest is None:
+        # Cached under the generation, so never from a lagging replica
+        longest = Flight.objects.using(DEFAULT_DB_ALIAS).aggregate(
+            longest=Max(
+                ExpressionWrapper(
+                    F("arrival_time") - F("departure_time"),
+                    output_field=DurationField(),
+                )
+            )
+        )["longest"]
+        cache.set(key, longest)
+    return longest
+
+
+def flights_overlapping(start, end):
+    """Flights in the air at some point of ``[start, end)``.
+
+    A flight overlapping the window departed less than the longest flight
+    before ``start``, which turns the search into a bounded range scan of
+    the departure_time index.
+    """
+    longest = longest_flight()
+    if longest is None or longest.total_seconds() <= 0:
+        return Flight.objects.none()
+    return Flight.objects.filter(
+        departure_time__gt=start - longest,
+        departure_time__lt=end,
+        arrival_time__gt=start,
+    )
+
+
+def available_crews(start, end, queryset=None):
+    if queryset is None:
+        queryset = Crew.objects.all()
+    busy = Crew.flights.through.objects.filter(
+        flight__in=flights_overlapping(start, end)
+    ).values("crew_id")
+    return queryset.exclude(id__in=busy)
@@ -0,0 +1,129 @@
+import datetime
+import re
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from airport.search import airport_ids_matching
+
+
+def parse_time_param(name, value):
+    """Parse a date or datetime query parameter into an aware datetime.
+
+    Returns a ``(moment, is_date)`` pair, a plain date becomes the start
+    of that day in the current time zone.
+    """
+    try:
+        day = parse_date(value)
+        is_date = day is not None
+        if is_date:
+            moment = datetime.datetime.combine(day, datetime.time.min)
+        else:
+            moment = parse_datetime(value)
+            if moment is None:
+                raise ValueError
+    except ValueError:
+        raise ValidationError({name: "A valid date or datetime is required."})
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment, is_date
+
+
+def day_range(name, value):
+    moment, is_date = parse_time_param(name, value)
+    if not is_date:
+        raise ValidationError({name: "A valid date is required."})
+    return moment, moment + datetime.timedelta(days=1)
+
+
+def parse_int_param(name, value):
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: "A valid integer is required."})
+
+
+def parse_float_param(name, value, minimum, maximum):
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValidationError({name: "A valid number is required."})
+    if not minimum <= number <= maximum:
+        raise ValidationError(
+            {name: f"A number from {minimum} to {maximum} is required."}
+        )
+    return number
+
+
+def parse_duration_param(name, value):
+    """Parse durations such as ``45m``, ``2h``, ``1h30m`` or ``90`` (minutes)."""
+    match = re.fullmatch(r"(?:(\d+)h)?(?:(\d+)m?)?", value.strip())
+    if not value.strip() or not match:
+        raise ValidationError({name: "A duration such as 45m or 2h is required."})
+    hours, minutes = match.groups()
+    try:
+        return datetime.timedelta(hours=int(hours or 0), minutes=int(minutes or 0))
+    except (OverflowError, ValueError):
+        # Beyond timedelta, or more digits than int() accepts
+        raise ValidationError({name: "The duration is too long."})
+
+
+def filter_time_range(queryset, field, params, prefix):
+    """Apply ``<prefix>_from`` (inclusive) and ``<prefix>_to`` (exclusive)
+    bounds to ``field``, a date-only ``_to`` includes the whole day."""
+    lower = params.get(f"{prefix}_from")
+    upper = params.get(f"{prefix}_to")
+
+    if lower:
+        moment, _ = parse_time_param(f"{prefix}_from", lower)
+        queryset = queryset.filter(**{f"{field}__gte": moment})
+
+    if upper:
+        moment, is_date = parse_time_param(f"{prefix}_to", upper)
+        if is_date:
+            moment += datetime.timedelta(days=1)
+        queryset = queryset.filter(**{f"{field}__lt": moment})
+
+    return queryset
+
+
+def filter_flights(queryset, params):
+    """Filter a Flight queryset by the flight list query parameters.
+
+    Every predicate compares a bare column, so indexes on route, departure
+    and arrival time stay usable.
+    """
+    source = params.get("source")
+    destination = params.get("destination")
+    departure_time = params.get("departure_time")
+    arrival_time = params.get("arrival_time")
+    min_available_seats = params.get("min_available_seats")
+
+    if source:
+        queryset = queryset.filter(route__source_id__in=airport_ids_matching(source))
+
+    if destination:
+        queryset = queryset.filter(
+            route__destination_id__in=airport_ids_matching(destination)
+        )
+
+    if departure_time:
+        start, end = day_range("departure_time", departure_time)
+        queryset = queryset.filter(departure_time__gte=start, departure_time__lt=end)
+
+    if arrival_time:
+        start, end = day_range("arrival_time", arrival_time)
+        queryset = queryset.filter(arrival_time__gte=start, arrival_time__lt=end)
+
+    queryset = filter_time_range(queryset, "departure_time", params, "departure")
+    queryset = filter_time_range(queryset, "arrival_time", params, "arrival")
+
+    if min_available_seats:
+        queryset = queryset.filter(
+            available_seats__gte=parse_int_param(
+                "min_available_seats", min_available_seats
+            )
+        )
+
+    return queryset
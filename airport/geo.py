@@ -0,0 +1,122 @@
+import math
+from typing import Any, NamedTuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distances in km, element-wise over arrays of degrees."""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(value, dtype=float)) for value in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def unit_vector(lat, lon):
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (
+        math.cos(lat) * math.cos(lon),
+        math.cos(lat) * math.sin(lon),
+        math.sin(lat),
+    )
+
+
+def chord_length(distance_km):
+    """Straight-line distance through the unit sphere for a surface one."""
+    return 2 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+class _Node(NamedTuple):
+    point: tuple
+    value: Any
+    axis: int
+    left: Any
+    right: Any
+
+
+class KDTree:
+    """3-d tree of points on the unit sphere.
+
+    Points on the sphere avoid the distortion and the antimeridian seam of
+    a latitude/longitude tree: a great-circle radius is a ball of fixed
+    chord length around the query point.
+    """
+
+    def __init__(self, items):
+        self.root = self._build(list(items), 0)
+
+    def _build(self, items, depth):
+        if not items:
+            return None
+        axis = depth % 3
+        items.sort(key=lambda item: item[0][axis])
+        middle = len(items) // 2
+        point, value = items[middle]
+        return _Node(
+            point,
+            value,
+            axis,
+            self._build(items[:middle], depth + 1),
+            self._build(items[middle + 1 :], depth + 1),
+        )
+
+    def within(self, center, radius):
+        """Values of the points at most ``radius`` away from ``center``."""
+        found = []
+        squared = radius * radius
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if sum((a - b) ** 2 for a, b in zip(node.point, center)) <= squared:
+                found.append(node.value)
+            offset = center[node.axis] - node.point[node.axis]
+            near, far = (
+                (node.left, node.right) if offset < 0 else (node.right, node.left)
+            )
+            stack.append(near)
+            if abs(offset) <= radius:
+                stack.append(far)
+        return found
+
+
+class AirportLocator:
+    def __init__(self, airports):
+        """``airports`` are ``(id, latitude, longitude)`` triples."""
+        self.coordinates = {
+            airport_id: (latitude, longitude)
+            for airport_id, latitude, longitude in airports
+        }
+        self.tree = KDTree(
+            (unit_vector(latitude, longitude), airport_id)
+            for airport_id, (latitude, longitude) in self.coordinates.items()
+        )
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls(
+            queryset.exclude(latitude=None)
+            .exclude(longitude=None)
+            .order_by()
+            .values_list("id", "latitude", "longitude")
+        )
+
+    def nearby(self, latitude, longitude, radius_km, limit):
+        """``(airport_id, distance_km)`` pairs within the radius, nearest
+        first."""
+        ids = self.tree.within(
+            unit_vector(latitude, longitude), chord_length(radius_km)
+        )
+        if not ids:
+            return []
+        latitudes, longitudes = zip(*(self.coordinates[pk] for pk in ids))
+        distances = haversine_km(latitude, longitude, latitudes, longitudes)
+        order = np.argsort(distances, kind="stable")[:limit]
+        return [(ids[index], float(distances[index])) for index in order]
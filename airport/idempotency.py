@@ -0,0 +1,113 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from airport.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+# Response headers replayed with the stored body
+REPLAYED_HEADERS = ("Location",)
+
+
+def fingerprint(data):
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def claim(user, key, request_hash):
+    """Return ``(record, created)``, the unique (user, key) constraint makes
+    exactly one of several concurrent requests create the record.
+
+    Expired records and incomplete ones whose lock ran out (the request
+    handling them died) are dropped first, so the key can be claimed again.
+    A record that is gone again after losing the race is claimed anew.
+    """
+    while True:
+        now = timezone.now()
+        IdempotencyKey.objects.filter(user=user, key=key).filter(
+            Q(expires_at__lte=now)
+            | Q(response_status__isnull=True, locked_until__lte=now)
+        ).delete()
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    request_hash=request_hash,
+                    locked_until=now
+                    + timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT),
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                )
+                return record, True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=user, key=key).first()
+            if record is not None:
+                return record, False
+            # The request holding the key released it meanwhile, claim again
+
+
+class IdempotentCreateMixin:
+    """Replay the first response to a create sent with an Idempotency-Key.
+
+    Retries get the stored response without running create again, while the
+    first request is still running they get 409 and should retry later.
+    Failed requests release the key so that they can be retried.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            return Response(
+                {"detail": f"{HEADER} must be at most 255 characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        request_hash = fingerprint(request.data)
+        record, created = claim(request.user, key, request_hash)
+        if not created:
+            return self.replay(record, request_hash)
+
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        # A no-op when a retry took the key over after the lock ran out
+        IdempotencyKey.objects.filter(pk=record.pk, response_status=None).update(
+            response_status=response.status_code,
+            response_body=response.data,
+            response_headers={
+                name: response[name] for name in REPLAYED_HEADERS if name in response
+            },
+            locked_until=None,
+        )
+        return response
+
+    @staticmethod
+    def replay(record, request_hash):
+        if record.request_hash != request_hash:
+            return Response(
+                {"detail": f"{HEADER} was already used with a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if not record.is_completed:
+            return Response(
+                {"detail": "A request with this key is still being processed."},
+                status=status.HTTP_409_CONFLICT,
+                headers={"Retry-After": "1"},
+            )
+        return Response(
+            record.response_body,
+            status=record.response_status,
+            headers={**record.response_headers, "Idempotent-Replayed": "true"},
+        )
@@ -0,0 +1,126 @@
+import io
+import logging
+import multiprocessing
+import os.path
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Q
+from PIL import Image
+
+from airport.models import Airplane
+from airport.storage import image_storage
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels of every generated variant
+SIZES = {"thumb": 160, "medium": 640}
+FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+
+_executor = None
+
+
+def render_variants(name):
+    """Write every size and format of the image stored under ``name``.
+
+    Runs in the worker processes, returns ``{size: {format: name}}``.
+    """
+    with image_storage.open(name) as source:
+        original = Image.open(source)
+        original.load()
+    if original.mode not in ("RGB", "RGBA"):
+        original = original.convert("RGBA" if "A" in original.getbands() else "RGB")
+
+    stem, _ = os.path.splitext(name)
+    variants = {}
+    for size, pixels in SIZES.items():
+        image = original.copy()
+        image.thumbnail((pixels, pixels))
+        for extension, image_format in FORMATS.items():
+            if image_format == "JPEG" and image.mode != "RGB":
+                image = image.convert("RGB")
+            buffer = io.BytesIO()
+            image.save(buffer, format=image_format, quality=80)
+            variants.setdefault(size, {})[extension] = image_storage.save(
+                f"{stem}-{size}.{extension}", ContentFile(buffer.getvalue())
+            )
+    return variants
+
+
+def record_variants(airplane_id, name, variants):
+    """Store variants unless the airplane got another image meanwhile."""
+    updated = Airplane.objects.filter(id=airplane_id, image=name).update(
+        image_variants=variants
+    )
+    if not updated:
+        release(variant_names(variants))
+    return bool(updated)
+
+
+def variant_names(variants):
+    return [name for formats in variants.values() for name in formats.values()]
+
+
+def references(name):
+    """Airplanes using a blob, as their image or one of its variants."""
+    return Airplane.objects.filter(
+        Q(image=name) | Q(image_variants__icontains=name)
+    ).count()
+
+
+def release(names):
+    """Delete the blobs nothing references any more.
+
+    A blob saved or reused within IMAGE_BLOB_GRACE seconds may belong to an
+    upload that has not committed yet, it is left to collect_image_blobs.
+    """
+    for name in set(names):
+        if name and not references(name):
+            image_storage.delete_unused(name, settings.IMAGE_BLOB_GRACE)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # Spawned workers never inherit the parent's database connections
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        )
+    return _executor
+
+
+def schedule_variants(airplane):
+    """Render variants of the airplane's image after the upload commits.
+
+    The image is content addressed, so when another airplane already has
+    variants of the same blob they are reused instead of rendered again.
+    """
+    airplane_id, name = airplane.id, airplane.image.name
+    rendered = (
+        Airplane.objects.filter(image=name)
+        .exclude(image_variants={})
+        .values_list("image_variants", flat=True)
+        .first()
+    )
+    if rendered:
+        Airplane.objects.filter(id=airplane_id).update(image_variants=rendered)
+        airplane.image_variants = rendered
+        return
+
+    def recorded(future):
+        try:
+            record_variants(airplane_id, name, future.result())
+        except Exception:
+            logger.exception("Image variants of airplane %s failed", airplane_id)
+        finally:
+            connection.close()
+
+    def submit():
+        get_executor().submit(render_variants, name).add_done_callback(recorded)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,32 @@
+from typing import Any, Iterable, NamedTuple
+
+
+class Interval(NamedTuple):
+    start: Any
+    end: Any
+    value: Any = None
+
+
+class IntervalIndex:
+    """Half-open ``[start, end)`` intervals sorted by start.
+
+    Sorting makes every overlap a neighbour: an interval only overlaps the
+    ones after it that start before it ends. Empty and inverted intervals
+    overlap nothing and are dropped.
+    """
+
+    def __init__(self, intervals: Iterable[Interval]):
+        self._intervals = sorted(
+            (interval for interval in intervals if interval.start < interval.end),
+            key=lambda interval: interval.start,
+        )
+
+    def conflicts(self):
+        """Every pair of overlapping intervals, earlier start first."""
+        pairs = []
+        for position, interval in enumerate(self._intervals):
+            for other in self._intervals[position + 1 :]:
+                if other.start >= interval.end:
+                    break
+                pairs.append((interval, other))
+        return pairs
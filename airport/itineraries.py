@@ -0,0 +1,169 @@
+from bisect import bisect_left
+from collections import defaultdict, deque
+from typing import Iterable, NamedTuple
+
+
+class Leg(NamedTuple):
+    flight_id: int
+    source: int
+    destination: int
+    departure: float
+    arrival: float
+
+
+class Itinerary(NamedTuple):
+    legs: tuple[Leg, ...]
+
+    @property
+    def departure(self):
+        return self.legs[0].departure
+
+    @property
+    def arrival(self):
+        return self.legs[-1].arrival
+
+    @property
+    def stops(self):
+        return len(self.legs) - 1
+
+
+class FlightGraph:
+    """Time-indexed adjacency of flights between airports.
+
+    Legs are kept sorted by departure per source airport and per
+    (source, destination) pair, so every hop of a search is a bisect over
+    a list instead of a database query. Times are POSIX timestamps.
+    """
+
+    def __init__(self, legs: Iterable[Leg]):
+        by_source = defaultdict(list)
+        by_pair = defaultdict(list)
+        for leg in sorted(legs, key=lambda leg: leg.departure):
+            by_source[leg.source].append(leg)
+            by_pair[(leg.source, leg.destination)].append(leg)
+
+        self._by_source = {
+            source: ([leg.departure for leg in legs], legs)
+            for source, legs in by_source.items()
+        }
+        self._by_pair = {
+            pair: ([leg.departure for leg in legs], legs)
+            for pair, legs in by_pair.items()
+        }
+        self._predecessors = defaultdict(set)
+        for source, destination in self._by_pair:
+            self._predecessors[destination].add(source)
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        rows = queryset.order_by().values_list(
+            "id",
+            "route__source_id",
+            "route__destination_id",
+            "departure_time",
+            "arrival_time",
+        )
+        return cls(
+            Leg(
+                flight_id,
+                source,
+                destination,
+                departure.timestamp(),
+                arrival.timestamp(),
+            )
+            for flight_id, source, destination, departure, arrival in rows
+        )
+
+    @staticmethod
+    def _window(index, earliest, latest):
+        departures, legs = index
+        return legs[bisect_left(departures, earliest) : bisect_left(departures, latest)]
+
+    def departures(self, airport, earliest, latest):
+        index = self._by_source.get(airport)
+        return self._window(index, earliest, latest) if index else []
+
+    def direct(self, source, destination, earliest, latest):
+        index = self._by_pair.get((source, destination))
+        return self._window(index, earliest, latest) if index else []
+
+    def _hops_to(self, destinations, max_hops):
+        """Fewest legs from each airport to any destination, up to max_hops."""
+        hops = dict.fromkeys(destinations, 0)
+        queue = deque(destinations)
+        while queue:
+            airport = queue.popleft()
+            if hops[airport] == max_hops:
+                continue
+            for predecessor in self._predecessors.get(airport, ()):
+                if predecessor not in hops:
+                    hops[predecessor] = hops[airport] + 1
+                    queue.append(predecessor)
+        return hops
+
+    def search(
+        self,
+        sources,
+        destinations,
+        earliest,
+        latest,
+        max_stops=1,
+        min_connection=45 * 60,
+        max_connection=6 * 3600,
+        limit=20,
+    ):
+        """Find itineraries whose first leg departs in [earliest, latest).
+
+        Connections must leave between min_connection and max_connection
+        seconds after the previous arrival, airports are never revisited and
+        airports that cannot reach a destination in the legs left are pruned.
+        Results are ordered by arrival, then by number of stops.
+        """
+        destinations = set(destinations)
+        max_legs = max_stops + 1
+        hops = self._hops_to(destinations, max_legs)
+        found = []
+
+        def extend(path, visited):
+            last = path[-1]
+            if last.destination in destinations:
+                found.append(Itinerary(tuple(path)))
+                return
+            legs_left = max_legs - len(path)
+            if not legs_left:
+                return
+            earliest_next = last.arrival + min_connection
+            latest_next = last.arrival + max_connection
+            if legs_left == 1:
+                candidates = [
+                    leg
+                    for destination in destinations
+                    for leg in self.direct(
+                        last.destination, destination, earliest_next, latest_next
+                    )
+                ]
+            else:
+                candidates = [
+                    leg
+                    for leg in self.departures(
+                        last.destination, earliest_next, latest_next
+                    )
+                    if hops.get(leg.destination, max_legs) < legs_left
+                    and leg.destination not in visited
+                ]
+            for leg in candidates:
+                path.append(leg)
+                visited.add(leg.destination)
+                extend(path, visited)
+                visited.discard(leg.destination)
+                path.pop()
+
+        for source in set(sources) - destinations:
+            if hops.get(source, max_legs + 1) > max_legs:
+                continue
+            for leg in self.departures(source, earliest, latest):
+                if hops.get(leg.destination, max_legs) < max_legs:
+                    extend([leg], {source, leg.destination})
+
+        found.sort(key=lambda itinerary: (itinerary.arrival, itinerary.stops))
+        return found[:limit]
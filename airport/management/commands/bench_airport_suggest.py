@@ -0,0 +1,55 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.search import AirportSuggestions, Suggestion
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark airport autocomplete on a synthetic in-memory index, "
+        "no database access is involved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--airports", type=int, default=50_000)
+        parser.add_argument("--queries", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def word(self, rng):
+        return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        airports = [
+            Suggestion(
+                airport_id,
+                " ".join(self.word(rng) for _ in range(rng.randint(1, 3))).title(),
+                self.word(rng).title(),
+            )
+            for airport_id in range(options["airports"])
+        ]
+
+        started = time.perf_counter()
+        index = AirportSuggestions(airports)
+        self.stdout.write(
+            f"Indexed {len(airports)} airports "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+        for length in (1, 3, 4, 6):
+            queries = [
+                rng.choice(airports).name[:length] for _ in range(options["queries"])
+            ]
+            timings = []
+            for query in queries:
+                started = time.perf_counter()
+                index.suggest(query)
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            self.stdout.write(
+                f"{length} character(s): median {timings[len(timings) // 2] * 1e6:.0f} us, "
+                f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.0f} us"
+            )
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+
+
+class ThreadPeak:
+    """Highest number of live threads, sampled in the background."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self.stopped = threading.Event()
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        threading.Thread(target=self.sample, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve flight details to concurrent clients through the sync view on "
+        "one thread per client (a threaded WSGI server) and through the async "
+        "view on the event loop (ASGI). Reports requests/s, peak threads and "
+        "traced memory per in-flight request. The data is written for real "
+        "(clients need their own connections) and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=20, help="per client")
+        parser.add_argument("--flights", type=int, default=200)
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:8]
+        airplane_type = AirplaneType.objects.create(name=f"bench-{suffix}")
+        airport = Airport.objects.create(name=f"bench-{suffix}", closest_big_city="")
+        route = Route.objects.create(source=airport, destination=airport, distance=0)
+        airplane = Airplane.objects.create(
+            name=f"bench-{suffix}", rows=30, seats_in_row=6, airplane_type=airplane_type
+        )
+        start = timezone.now()
+        flights = Flight.objects.bulk_create(
+            Flight(
+                route=route,
+                airplane=airplane,
+                departure_time=start + timedelta(hours=i),
+                arrival_time=start + timedelta(hours=i + 3),
+                available_seats=airplane.capacity,
+            )
+            for i in range(options["flights"])
+        )
+        user = get_user_model().objects.create_user(
+            email=f"bench-{suffix}@example.com", password=None
+        )
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+        try:
+            # As served in production: no query log, no debug toolbar
+            with override_settings(DEBUG=False, ALLOWED_HOSTS=["testserver"]):
+                for label, url_name, serve in (
+                    ("wsgi", "airport:flight-detail", self.serve_threads),
+                    ("asgi", "airport:async-flight-detail", self.serve_async),
+                ):
+                    urls = [reverse(url_name, args=[flight.id]) for flight in flights]
+                    self.run(label, serve, urls, headers, options)
+        finally:
+            user.delete()
+            airport.delete()
+            airplane_type.delete()
+
+    def run(self, label, serve, urls, headers, options):
+        clients = options["clients"]
+        with ThreadPeak() as threads:
+            started = time.perf_counter()
+            serve(urls, headers, clients, options["requests"])
+            elapsed = time.perf_counter() - started
+
+        # One request per client, so every one of them is in flight at once
+        tracemalloc.start()
+        serve(urls, headers, clients, 1)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.stdout.write(
+            f"{label}: {clients * options['requests'] / elapsed:.0f} requests/s, "
+            f"peak {threads.peak} threads, "
+            f"{peak / clients / 1024:.0f} KiB per in-flight request"
+        )
+
+    @staticmethod
+    def serve_threads(urls, headers, clients, requests):
+        def client_loop(offset):
+            client = Client()
+            try:
+                for i in range(requests):
+                    url = urls[(offset + i) % len(urls)]
+                    if client.get(url, headers=headers).status_code != 200:
+                        raise RuntimeError(f"GET {url} failed")
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=client_loop, args=(offset,))
+            for offset in range(clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    @staticmethod
+    def serve_async(urls, headers, clients, requests):
+        async def client_loop(offset):
+            client = AsyncClient()
+            # What the ASGI handler does per connection: ORM calls of one
+            # client share a thread (and its database connection)
+            async with ThreadSensitiveContext():
+                try:
+                    for i in range(requests):
+                        url = urls[(offset + i) % len(urls)]
+                        response = await client.get(url, headers=headers)
+                        if response.status_code != 200:
+                            raise RuntimeError(f"GET {url} failed")
+                finally:
+                    await sync_to_async(connections.close_all)()
+
+        async def main():
+            await asyncio.gather(*(client_loop(offset) for offset in range(clients)))
+
+        asyncio.run(main())
@@ -0,0 +1,115 @@
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from airport.exceptions import SeatConflict
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+from airport.serializers import OrderSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress the order path with concurrent bookings on one hot flight and "
+        "report bookings per second and conflict rates. The data is written "
+        "for real (threads need their own connections) and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--attempts", type=int, default=100, help="per thread")
+        parser.add_argument("--rows", type=int, default=30)
+        parser.add_argument("--seats-in-row", type=int, default=6)
+        parser.add_argument("--tickets-per-order", type=int, default=2)
+
+    def handle(self, *args, **options):
+        suffix = uuid.uuid4().hex[:8]
+        airplane_type = AirplaneType.objects.create(name=f"bench-{suffix}")
+        airport = Airport.objects.create(name=f"bench-{suffix}", closest_big_city="")
+        flight = Flight.objects.create(
+            route=Route.objects.create(source=airport, destination=airport, distance=0),
+            airplane=Airplane.objects.create(
+                name=f"bench-{suffix}",
+                rows=options["rows"],
+                seats_in_row=options["seats_in_row"],
+                airplane_type=airplane_type,
+            ),
+            departure_time=timezone.now(),
+            arrival_time=timezone.now(),
+        )
+        user = get_user_model().objects.create_user(
+            email=f"bench-{suffix}@example.com", password=None
+        )
+
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def book():
+            rng = random.Random()
+            try:
+                for _ in range(options["attempts"]):
+                    row = rng.randint(1, options["rows"])
+                    first_seat = rng.randint(
+                        1, options["seats_in_row"] - options["tickets_per_order"] + 1
+                    )
+                    serializer = OrderSerializer(
+                        data={
+                            "tickets": [
+                                {"row": row, "seat": seat, "flight": flight.id}
+                                for seat in range(
+                                    first_seat,
+                                    first_seat + options["tickets_per_order"],
+                                )
+                            ]
+                        },
+                        context={},
+                    )
+                    try:
+                        serializer.is_valid(raise_exception=True)
+                        serializer.save(user=user)
+                        outcome = "booked"
+                    except SeatConflict:
+                        outcome = "conflict (409)"
+                    except ValidationError:
+                        outcome = "already taken (400)"
+                    except Exception as error:
+                        outcome = f"error: {type(error).__name__}"
+                    with lock:
+                        outcomes[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book) for _ in range(options["threads"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        try:
+            flight.refresh_from_db()
+            sold = flight.tickets.count()
+            attempts = sum(outcomes.values())
+            self.stdout.write(
+                f"{options['threads']} threads, {attempts} orders in {elapsed:.2f}s"
+            )
+            self.stdout.write(f"{outcomes['booked'] / elapsed:.1f} bookings/s")
+            for outcome, count in sorted(outcomes.items()):
+                self.stdout.write(f"{outcome:>20}: {count} ({count / attempts:.1%})")
+            consistent = flight.available_seats == flight.airplane.capacity - sold
+            self.stdout.write(
+                f"{sold} seats sold, available_seats counter is "
+                + ("consistent" if consistent else "INCONSISTENT")
+            )
+        finally:
+            user.delete()
+            airport.delete()
+            airplane_type.delete()
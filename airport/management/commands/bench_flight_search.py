@@ -0,0 +1,105 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+from airport.search import airport_ids_matching
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the legacy icontains join with the airport id search layer "
+        "on a synthetic flight table. All data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flights", type=int, default=1_000_000)
+        parser.add_argument("--airports", type=int, default=200)
+        parser.add_argument("--routes", type=int, default=2_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            self.run(options["airports"], options["repeat"])
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        started = time.perf_counter()
+        airports = Airport.objects.bulk_create(
+            Airport(name=f"Airport {i:04d}", closest_big_city=f"City {i:04d}")
+            for i in range(options["airports"])
+        )
+        routes = Route.objects.bulk_create(
+            Route(
+                source=source,
+                destination=destination,
+                distance=random.randint(200, 5000),
+            )
+            for source, destination in (
+                random.sample(airports, 2) for _ in range(options["routes"])
+            )
+        )
+        airplane = Airplane.objects.create(
+            name="Benchmark",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Benchmark type"),
+        )
+        start = timezone.now()
+        batch_size = options["batch_size"]
+        for offset in range(0, options["flights"], batch_size):
+            flights = []
+            for i in range(offset, min(offset + batch_size, options["flights"])):
+                departure_time = start + timedelta(minutes=i)
+                flights.append(
+                    Flight(
+                        route=random.choice(routes),
+                        airplane=airplane,
+                        departure_time=departure_time,
+                        arrival_time=departure_time + timedelta(hours=3),
+                        available_seats=airplane.capacity,
+                    )
+                )
+            Flight.objects.bulk_create(flights, batch_size=batch_size)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        self.stdout.write(
+            f"Seeded {options['flights']} flights "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    def run(self, airports, repeat):
+        terms = [f"city {random.randrange(airports):04d}" for _ in range(repeat)]
+
+        def legacy(term):
+            return Flight.objects.filter(
+                Q(route__source__name__icontains=term)
+                | Q(route__source__closest_big_city__icontains=term)
+            ).order_by("id")
+
+        def indexed(term):
+            return Flight.objects.filter(
+                route__source_id__in=airport_ids_matching(term)
+            ).order_by("id")
+
+        for label, build in (("icontains join", legacy), ("airport ids", indexed)):
+            timings = []
+            for term in terms:
+                started = time.perf_counter()
+                queryset = build(term)
+                queryset.count()
+                list(queryset[:10])
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            self.stdout.write(
+                f"{label:>15}: median {timings[len(timings) // 2] * 1000:.1f} ms, "
+                f"max {timings[-1] * 1000:.1f} ms"
+            )
@@ -0,0 +1,120 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+from airport.search import build_flight_graph
+
+DAY = 24 * 3600
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark connecting itinerary search on a synthetic network: the "
+        "load of the flight graph from the database (paid once per date "
+        "window and flight change), then searches over it. All data is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--airports", type=int, default=500)
+        parser.add_argument("--routes-per-airport", type=int, default=20)
+        parser.add_argument("--flights-per-day", type=int, default=100_000)
+        parser.add_argument("--days", type=int, default=2)
+        parser.add_argument("--max-stops", type=int, default=2)
+        parser.add_argument("--searches", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start, airports = self.seed(options)
+            self.run(start, airports, options)
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        rng = random.Random(options["seed"])
+        started = time.perf_counter()
+        airports = Airport.objects.bulk_create(
+            Airport(name=f"Airport {i:04d}", closest_big_city=f"City {i:04d}")
+            for i in range(options["airports"])
+        )
+        routes = Route.objects.bulk_create(
+            Route(source=source, destination=destination, distance=500)
+            for source in airports
+            for destination in rng.sample(
+                [airport for airport in airports if airport != source],
+                options["routes_per_airport"],
+            )
+        )
+        airplane = Airplane.objects.create(
+            name="Benchmark",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Benchmark type"),
+        )
+
+        start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        total = options["flights_per_day"] * options["days"]
+        batch_size = options["batch_size"]
+        for offset in range(0, total, batch_size):
+            flights = []
+            for _ in range(offset, min(offset + batch_size, total)):
+                departure_time = start + datetime.timedelta(
+                    seconds=rng.uniform(0, options["days"] * DAY)
+                )
+                flights.append(
+                    Flight(
+                        route=rng.choice(routes),
+                        airplane=airplane,
+                        departure_time=departure_time,
+                        arrival_time=departure_time
+                        + datetime.timedelta(seconds=rng.uniform(3600, 6 * 3600)),
+                        available_seats=airplane.capacity,
+                    )
+                )
+            Flight.objects.bulk_create(flights, batch_size=batch_size)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        self.stdout.write(
+            f"Seeded {total} flights in {time.perf_counter() - started:.1f}s"
+        )
+        return start, [airport.id for airport in airports]
+
+    def run(self, start, airports, options):
+        rng = random.Random(options["seed"])
+        started = time.perf_counter()
+        graph = build_flight_graph((start, options["days"]))
+        self.stdout.write(
+            f"Loaded the graph of {options['days']} days from the database in "
+            f"{(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+        timings, results = [], 0
+        earliest = start.timestamp()
+        for _ in range(options["searches"]):
+            source, destination = rng.sample(airports, 2)
+            started = time.perf_counter()
+            results += len(
+                graph.search(
+                    [source],
+                    [destination],
+                    earliest,
+                    earliest + DAY,
+                    max_stops=options["max_stops"],
+                )
+            )
+            timings.append(time.perf_counter() - started)
+
+        timings.sort()
+        self.stdout.write(
+            f"{options['searches']} searches, max_stops={options['max_stops']}: "
+            f"median {timings[len(timings) // 2] * 1000:.1f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95)] * 1000:.1f} ms, "
+            f"{results / len(timings):.1f} itineraries per search"
+        )
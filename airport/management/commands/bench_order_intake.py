@@ -0,0 +1,104 @@
+import itertools
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+from airport.order_queue import process_batch
+from airport.views import OrderViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the latency of booking orders inline with queueing them "
+        "(Prefer: respond-async), then drain the queue and report the worker "
+        "throughput. All data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=500)
+        parser.add_argument("--tickets-per-order", type=int, default=2)
+        parser.add_argument("--batch-size", type=int, default=50)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def seed(self, seats):
+        airport = Airport.objects.create(name="Benchmark", closest_big_city="")
+        airplane = Airplane.objects.create(
+            name="Benchmark",
+            rows=seats // 10 + 1,
+            seats_in_row=10,
+            airplane_type=AirplaneType.objects.create(name="Benchmark type"),
+        )
+        route = Route.objects.create(source=airport, destination=airport, distance=0)
+        return [
+            Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=timezone.now(),
+                arrival_time=timezone.now(),
+            )
+            for _ in range(2)
+        ]
+
+    def orders(self, flight, count, tickets_per_order):
+        seats = ((row, seat) for row in itertools.count(1) for seat in range(1, 11))
+        for _ in range(count):
+            yield {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": flight.id}
+                    for row, seat in (next(seats) for _ in range(tickets_per_order))
+                ]
+            }
+
+    def timed_posts(self, user, flight, options, headers):
+        factory = APIRequestFactory()
+        view = OrderViewSet.as_view({"post": "create"})
+        timings = []
+        for data in self.orders(
+            flight, options["orders"], options["tickets_per_order"]
+        ):
+            request = factory.post("/", data, format="json", headers=headers)
+            force_authenticate(request, user)
+            started = time.perf_counter()
+            response = view(request)
+            timings.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(f"Order failed: {response.data}")
+        return sorted(timings)
+
+    def report(self, label, timings):
+        self.stdout.write(
+            f"{label:>8}: p50 {timings[len(timings) // 2] * 1000:.1f} ms, "
+            f"p99 {timings[int(len(timings) * 0.99)] * 1000:.1f} ms"
+        )
+
+    def run(self, options):
+        seats = options["orders"] * options["tickets_per_order"]
+        inline_flight, queued_flight = self.seed(seats)
+        user = get_user_model().objects.create_user(
+            email="bench-orders@example.com", password=None
+        )
+
+        self.report("inline", self.timed_posts(user, inline_flight, options, {}))
+        self.report(
+            "queued",
+            self.timed_posts(user, queued_flight, options, {"Prefer": "respond-async"}),
+        )
+
+        started = time.perf_counter()
+        processed = 0
+        while count := process_batch(options["batch_size"]):
+            processed += count
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Drained {processed} queued orders in {elapsed:.2f}s "
+            f"({processed / elapsed:.0f} orders/s, one worker)"
+        )
@@ -0,0 +1,39 @@
+import posixpath
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from airport.images import variant_names
+from airport.models import Airplane
+from airport.storage import image_storage
+
+UPLOAD_DIRECTORY = "uploads/images"
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete airplane image blobs nothing references, e.g. the ones "
+        "kept while their upload could still have been committing"
+    )
+
+    def handle(self, *args, **options):
+        if not image_storage.exists(UPLOAD_DIRECTORY):
+            return
+        # Listed before the references are read, a blob whose upload
+        # commits meanwhile is recent and spared by delete_unused()
+        names = [
+            posixpath.join(UPLOAD_DIRECTORY, filename)
+            for filename in image_storage.listdir(UPLOAD_DIRECTORY)[1]
+            if not filename.startswith(".")
+        ]
+        referenced = set()
+        for image, variants in Airplane.objects.values_list("image", "image_variants"):
+            referenced.add(image)
+            referenced.update(variant_names(variants))
+
+        deleted = sum(
+            image_storage.delete_unused(name, settings.IMAGE_BLOB_GRACE)
+            for name in names
+            if name not in referenced
+        )
+        self.stdout.write(f"Deleted {deleted} unused image blob(s)")
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.models import SeatHold
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds in batches, optionally in a loop"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep sweeping every --interval seconds",
+        )
+        parser.add_argument("--interval", type=float, default=30)
+
+    def sweep(self, batch_size):
+        deleted = 0
+        while True:
+            # Short batches keep each DELETE's locks brief at peak traffic
+            ids = list(
+                SeatHold.objects.expired()
+                .order_by("expires_at")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            deleted += SeatHold.objects.filter(id__in=ids).expired().delete()[0]
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = self.sweep(options["batch_size"])
+            self.stdout.write(f"Expired {deleted} seat hold(s)")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
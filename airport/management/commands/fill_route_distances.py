@@ -0,0 +1,70 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from airport.cache import bump_generation
+from airport.geo import haversine_km
+from airport.models import Route
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare Route.distance with the great-circle distance between the "
+        "airport coordinates, computed for all routes at once, and optionally "
+        "overwrite the ones that are off"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=5,
+            help="Allowed deviation in percent",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Store the computed distance of routes outside the tolerance",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = list(
+            Route.objects.exclude(source__latitude=None)
+            .exclude(source__longitude=None)
+            .exclude(destination__latitude=None)
+            .exclude(destination__longitude=None)
+            .values_list(
+                "id",
+                "distance",
+                "source__latitude",
+                "source__longitude",
+                "destination__latitude",
+                "destination__longitude",
+            )
+        )
+        if not rows:
+            self.stdout.write("No routes between airports with coordinates")
+            return
+
+        ids, stored, *coordinates = (np.array(column) for column in zip(*rows))
+        computed = np.rint(haversine_km(*coordinates)).astype(int)
+        off = np.abs(stored - computed) > computed * options["tolerance"] / 100
+        self.stdout.write(
+            f"{int(off.sum())} of {len(rows)} route distance(s) differ by more "
+            f"than {options['tolerance']}%"
+        )
+        if not options["fix"]:
+            return
+
+        routes = [
+            Route(id=int(route_id), distance=int(distance))
+            for route_id, distance in zip(ids[off], computed[off])
+        ]
+        with transaction.atomic():
+            Route.objects.bulk_update(
+                routes, ["distance"], batch_size=options["batch_size"]
+            )
+            # bulk_update sends no signals
+            bump_generation("flights")
+        self.stdout.write(f"Updated {len(routes)} route(s)")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from airport.images import get_executor, record_variants, render_variants
+from airport.models import Airplane
+
+
+class Command(BaseCommand):
+    help = (
+        "Render missing thumbnails and WebP variants of airplane images in "
+        "the worker pool, e.g. for images uploaded before variants existed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also re-render images that already have variants",
+        )
+
+    def handle(self, *args, **options):
+        airplanes = Airplane.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            airplanes = airplanes.filter(image_variants={})
+        pending = list(airplanes.values_list("id", "image"))
+
+        rendered = get_executor().map(render_variants, [name for _, name in pending])
+        recorded = sum(
+            record_variants(airplane_id, name, variants)
+            for (airplane_id, name), variants in zip(pending, rendered)
+        )
+        self.stdout.write(f"Rendered variants of {recorded} airplane image(s)")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from airport.models import Flight
+
+
+class Command(BaseCommand):
+    help = "Recalculate Flight.available_seats from airplane capacity and sold tickets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--flight",
+            type=int,
+            action="append",
+            dest="flights",
+            help="Only repair the given flight id (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Flight.objects.all()
+        if options["flights"]:
+            queryset = queryset.filter(id__in=options["flights"])
+        updated = Flight.recount_available_seats(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Recounted {updated} flight(s)"))
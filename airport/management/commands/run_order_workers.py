@@ -0,0 +1,40 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from airport.order_queue import STALE_AFTER, requeue_stale, run_worker
+
+
+def work(batch_size, poll_interval, once):
+    return run_worker(batch_size=batch_size, poll_interval=poll_interval, once=once)
+
+
+class Command(BaseCommand):
+    help = (
+        "Book orders queued with Prefer: respond-async in a pool of worker "
+        "processes, each claiming batches of pending requests"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--poll-interval", type=float, default=0.5)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the queue is drained",
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale(STALE_AFTER)
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale order request(s)")
+
+        # Forked children must not share the parent's database connection
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        arguments = (options["batch_size"], options["poll_interval"], options["once"])
+        with context.Pool(options["processes"]) as pool:
+            processed = pool.starmap(work, [arguments] * options["processes"])
+        self.stdout.write(f"Processed {sum(processed)} order request(s)")
@@ -0,0 +1,143 @@
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+# Blobs of ContentAddressedStorage, their content never changes
+CONTENT_ADDRESSED = re.compile(r"(?P<digest>[0-9a-f]{64})\.\w+")
+RANGE = re.compile(r"bytes=(?P<start>\d*)-(?P<end>\d*)")
+CHUNK_SIZE = 64 * 1024
+
+
+def media_etag(path, stat):
+    match = CONTENT_ADDRESSED.fullmatch(posixpath.basename(path))
+    if match:
+        return quote_etag(match["digest"]), True
+    return quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}"), False
+
+
+def parse_range(header, size):
+    """Byte range ``(start, end)`` of a single range header, inclusive.
+
+    Returns None when the header is absent or malformed (serve the whole
+    file) and raises ValueError when it cannot be satisfied.
+    """
+    match = RANGE.fullmatch(header.strip()) if header else None
+    if match is None or not (match["start"] or match["end"]):
+        return None
+    if not match["start"]:
+        length = int(match["end"])
+        if not length:
+            raise ValueError
+        return max(size - length, 0), size - 1
+    start = int(match["start"])
+    end = min(int(match["end"]), size - 1) if match["end"] else size - 1
+    if start >= size or start > end:
+        raise ValueError
+    return start, end
+
+
+def read_range(file, start, end):
+    try:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve MEDIA_ROOT files without tying up a worker where possible.
+
+    Behind nginx (MEDIA_ACCEL_REDIRECT) or Apache/lighttpd (MEDIA_SENDFILE)
+    the response only carries headers and the web server sends the file.
+    Otherwise the file goes out as a FileResponse, which the WSGI server can
+    hand to sendfile(), or as the requested byte range. Conditional requests
+    are answered with 304 in every mode.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    etag, immutable = media_etag(path, stat)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = file_response(request, path, full_path, stat.st_size, etag)
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(stat.st_mtime)
+    response.headers["Accept-Ranges"] = "bytes"
+    if immutable:
+        patch_cache_control(
+            response, public=True, max_age=365 * 24 * 60 * 60, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def file_response(request, path, full_path, size, etag):
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    if settings.MEDIA_ACCEL_REDIRECT:
+        response = HttpResponse(content_type=content_type)
+        response.headers["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT + quote(
+            path
+        )
+        return response
+    if settings.MEDIA_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+        response.headers["X-Sendfile"] = full_path
+        return response
+
+    if_range = request.headers.get("If-Range")
+    try:
+        byte_range = (
+            parse_range(request.headers.get("Range"), size)
+            if if_range in (None, etag)
+            else None
+        )
+    except ValueError:
+        response = HttpResponse(status=416)
+        response.headers["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(full_path, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(open(full_path, "rb"), start, end),
+            status=206,
+            content_type=content_type,
+        )
+        response.headers["Content-Length"] = str(end - start + 1)
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,234 @@
+import bisect
+import os
+import socket
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_safe
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PROCESSES_KEY = "metrics:processes"
+PROCESS_KEY = "metrics:process:{}"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "sql_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+
+
+_current = ContextVar("request_metrics", default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    """Execute wrapper timing the queries of the current request.
+
+    Installed on every connection (signals.install_query_counter), so it also
+    sees the queries async views run in worker threads, which inherit the
+    request's context.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.sql_time += time.perf_counter() - started
+
+
+class Registry:
+    """Per-process request metrics by route.
+
+    Recording is a dictionary update under a lock. Every
+    METRICS_FLUSH_INTERVAL seconds the process publishes a snapshot to the
+    cache, where the /metrics view of any process finds it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.process = f"{socket.gethostname()}:{os.getpid()}"
+        self.requests = {}  # (route, method, status) -> count
+        self.latency = {}  # (route, method) -> bucket counts, +Inf, sum
+        self.queries = {}  # (route, method) -> [queries, SQL seconds]
+        self.next_flush = 0.0
+
+    def record(self, route, method, status, duration, metrics):
+        key = (route, method)
+        with self.lock:
+            status_key = (route, method, status)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            latency = self.latency.get(key)
+            if latency is None:
+                latency = self.latency[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+            latency[bisect.bisect_left(BUCKETS, duration)] += 1
+            latency[-1] += duration
+            queries = self.queries.setdefault(key, [0, 0.0])
+            queries[0] += metrics.queries
+            queries[1] += metrics.sql_time
+
+            now = time.monotonic()
+            if now < self.next_flush:
+                return
+            self.next_flush = now + settings.METRICS_FLUSH_INTERVAL
+            snapshot = self.snapshot()
+        self.publish(snapshot)
+
+    def snapshot(self):
+        return {
+            "requests": dict(self.requests),
+            "latency": {key: list(value) for key, value in self.latency.items()},
+            "queries": {key: list(value) for key, value in self.queries.items()},
+        }
+
+    def publish(self, snapshot):
+        # Processes that stop publishing drop out with their snapshot
+        timeout = settings.METRICS_FLUSH_INTERVAL * 6
+        cache.set(PROCESS_KEY.format(self.process), snapshot, timeout=timeout)
+        processes = cache.get(PROCESSES_KEY, [])
+        if self.process not in processes:
+            # A registration lost to a concurrent one is retried next flush
+            cache.set(PROCESSES_KEY, processes + [self.process], timeout=None)
+
+    def collect(self):
+        """Snapshots of all live processes, this one's up to date."""
+        with self.lock:
+            snapshot = self.snapshot()
+        processes = cache.get(PROCESSES_KEY, [])
+        found = cache.get_many([PROCESS_KEY.format(name) for name in processes])
+        snapshots = {
+            name: found[PROCESS_KEY.format(name)]
+            for name in processes
+            if PROCESS_KEY.format(name) in found
+        }
+        if len(snapshots) < len(processes):
+            cache.set(PROCESSES_KEY, list(snapshots), timeout=None)
+        snapshots[self.process] = snapshot
+        return snapshots
+
+
+registry = Registry()
+os.register_at_fork(after_in_child=registry.reset)
+
+
+def labels(**values):
+    return ",".join(f'{name}="{value}"' for name, value in values.items())
+
+
+def render(snapshots):
+    lines = [
+        "# HELP http_requests_total Requests by route, method and status.",
+        "# TYPE http_requests_total counter",
+    ]
+    for process, snapshot in snapshots.items():
+        for (route, method, status), count in sorted(snapshot["requests"].items()):
+            lines.append(
+                f"http_requests_total{{"
+                f"{labels(process=process, route=route, method=method, status=status)}"
+                f"}} {count}"
+            )
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency by route and method.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for process, snapshot in snapshots.items():
+        for (route, method), latency in sorted(snapshot["latency"].items()):
+            series = labels(process=process, route=route, method=method)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), latency):
+                cumulative += count
+                lines.append(
+                    f'http_request_duration_seconds_bucket{{{series},le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(f"http_request_duration_seconds_sum{{{series}}} {latency[-1]}")
+            lines.append(
+                f"http_request_duration_seconds_count{{{series}}} {cumulative}"
+            )
+
+    for name, column, help_text in (
+        ("db_queries_total", 0, "SQL queries by route and method."),
+        ("db_query_duration_seconds_total", 1, "SQL time by route and method."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for process, snapshot in snapshots.items():
+            for (route, method), values in sorted(snapshot["queries"].items()):
+                series = labels(process=process, route=route, method=method)
+                lines.append(f"{name}{{{series}}} {values[column]}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Record latency and SQL of every request that resolved to a named route.
+
+    Unresolved paths (404s) are skipped, they would give every scanned URL a
+    series of its own.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, time.perf_counter() - started, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, time.perf_counter() - started, metrics)
+        return response
+
+    @staticmethod
+    def record(request, response, duration, metrics):
+        match = request.resolver_match
+        if match is None or not match.view_name or match.view_name == "metrics":
+            return
+        registry.record(
+            match.view_name, request.method, response.status_code, duration, metrics
+        )
+
+
+@require_safe
+def metrics_view(request):
+    """Prometheus text exposition of the metrics of all processes.
+
+    Requires ``Authorization: Bearer <METRICS_TOKEN>`` when the setting is set.
+    """
+    if settings.METRICS_TOKEN and not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+    return HttpResponse(render(registry.collect()), content_type=CONTENT_TYPE)
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:27
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_available_seats(apps, schema_editor):
+    Airplane = apps.get_model("airport", "Airplane")
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+    capacity = Airplane.objects.filter(pk=OuterRef("airplane_id")).values(
+        capacity=F("rows") * F("seats_in_row")
+    )
+    sold = (
+        Ticket.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Flight.objects.update(
+        available_seats=Subquery(capacity) - Coalesce(Subquery(sold), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0003_airplane_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="available_seats",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_available_seats, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["available_seats"], name="flight_available_seats_idx"
+            ),
+        ),
+    ]
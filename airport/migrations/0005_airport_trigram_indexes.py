@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-17 05:02
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = {
+    "airport_name_trgm_idx": "name",
+    "airport_city_trgm_idx": "closest_big_city",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, column in TRIGRAM_INDEXES.items():
+        # Matches the expression Django emits for icontains lookups:
+        # UPPER("column"::text) LIKE UPPER(%s)
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON airport_airport "
+            f"USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for index_name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0004_flight_available_seats"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
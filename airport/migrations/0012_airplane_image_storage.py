@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 05:08
+
+import airport.models
+import airport.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0011_airplane_image_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="airplane",
+            name="image",
+            field=models.ImageField(
+                null=True,
+                storage=airport.storage.ContentAddressedStorage(),
+                upload_to=airport.models.upload_images,
+            ),
+        ),
+    ]
@@ -2,14 +2,31 @@ import os.path
 import uuid
 
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.text import slugify
 from rest_framework.exceptions import ValidationError
 
+from airport.storage import image_storage
+
 
 class Airport(models.Model):
     name = models.CharField(max_length=63)
     closest_big_city = models.CharField(max_length=63)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
 
     class Meta:
         ordering = ["name"]
@@ -63,7 +80,9 @@ class Airplane(models.Model):
     airplane_type = models.ForeignKey(
         AirplaneType, on_delete=models.CASCADE, related_name="airplanes"
     )
-    image = models.ImageField(null=True, upload_to=upload_images)
+    image = models.ImageField(null=True, upload_to=upload_images, storage=image_storage)
+    # {"thumb": {"webp": name, "jpg": name}, ...}, filled by airport.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     @property
     def capacity(self):
@@ -80,9 +99,55 @@ class Flight(models.Model):
     )
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
+    available_seats = models.IntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-departure_time"]
+        indexes = [
+            models.Index(fields=["available_seats"], name="flight_available_seats_idx"),
+            models.Index(
+                fields=["route", "departure_time"], name="flight_route_departure_idx"
+            ),
+            models.Index(
+                fields=["departure_time", "id"], name="flight_departure_id_idx"
+            ),
+            models.Index(fields=["arrival_time", "id"], name="flight_arrival_id_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding:
+            self.available_seats = self.airplane.capacity
+        super().save(*args, **kwargs)
+        if not adding:
+            # Recounted inside an UPDATE so tickets sold concurrently
+            # are not overwritten with a stale absolute value
+            Flight.recount_available_seats(Flight.objects.filter(pk=self.pk))
+            self.refresh_from_db(fields=["available_seats"])
+
+    @staticmethod
+    def change_available_seats(flight_id, delta):
+        Flight.objects.filter(pk=flight_id).update(
+            available_seats=F("available_seats") + delta
+        )
+
+    @staticmethod
+    def recount_available_seats(queryset=None):
+        if queryset is None:
+            queryset = Flight.objects.all()
+        capacity = Airplane.objects.filter(pk=OuterRef("airplane_id")).values(
+            capacity=F("rows") * F("seats_in_row")
+        )
+        sold = (
+            Ticket.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return queryset.update(
+            available_seats=Subquery(capacity) - Coalesce(Subquery(sold), Value(0))
+        )
 
     def __str__(self):
         return (
@@ -108,7 +173,8 @@ class Ticket(models.Model):
     order = models.ForeignKey("Order", on_delete=models.CASCADE, related_name="tickets")
 
     @staticmethod
-    def validate_ticket(row, seat, airplane, error_to_raise):
+    def validate_ticket(row, seat, airplane, error_to_raise, held_seats=()):
+        """held_seats are (row, seat) pairs held by other customers"""
         for ticket_attr_value, ticket_attr_name, airplane_attr_name in [
             (row, "row", "rows"),
             (seat, "seat", "seats_in_row"),
@@ -123,6 +189,10 @@ class Ticket(models.Model):
                         f"(1, {count_attrs})"
                     }
                 )
+        if (row, seat) in held_seats:
+            raise error_to_raise(
+                {"seat": f"seat {seat} in row {row} is held by another customer"}
+            )
 
     def clean(self):
         Ticket.validate_ticket(
@@ -130,6 +200,12 @@ class Ticket(models.Model):
             seat=self.seat,
             airplane=self.flight.airplane,
             error_to_raise=ValidationError,
+            held_seats=set(
+                SeatHold.objects.active()
+                .filter(flight_id=self.flight_id, row=self.row, seat=self.seat)
+                .exclude(user_id=self.order.user_id)
+                .values_list("row", "seat")
+            ),
         )
 
     def save(
@@ -158,6 +234,114 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"], name="order_user_created_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Created at: {self.created_at}"
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class SeatHold(models.Model):
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    expires_at = models.DateTimeField()
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ("row", "seat", "flight")
+        ordering = ["row", "seat"]
+        indexes = [
+            models.Index(fields=["expires_at"], name="seat_hold_expires_idx"),
+        ]
+
+    @property
+    def is_active(self):
+        return self.expires_at > timezone.now()
+
+    def __str__(self):
+        return f"{self.flight_id}: {self.row} -> {self.seat} until {self.expires_at}"
+
+
+class IdempotencyKey(models.Model):
+    """First response to a request sent with an Idempotency-Key header."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+    )
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    response_headers = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # An incomplete record older than this belongs to a request that died
+    locked_until = models.DateTimeField(null=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "key")
+        indexes = [
+            models.Index(fields=["expires_at"], name="idempotency_expires_idx"),
+        ]
+
+    @property
+    def is_completed(self):
+        return self.response_status is not None
+
+    def __str__(self):
+        return f"{self.user_id}: {self.key}"
+
+
+class OrderRequest(models.Model):
+    """Order payload queued by the asynchronous intake, see airport.order_queue."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        PROCESSING = "processing"
+        DONE = "done"
+        FAILED = "failed"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="order_requests",
+    )
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=15, choices=Status.choices, default=Status.PENDING
+    )
+    order = models.OneToOneField(
+        Order, on_delete=models.SET_NULL, null=True, related_name="request"
+    )
+    errors = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "id"], name="order_request_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.id}: {self.status}"
@@ -0,0 +1,141 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from airport.models import OrderRequest
+from airport.serializers import OrderRequestSerializer, order_serializer_class
+
+logger = logging.getLogger(__name__)
+
+# Processing requests not updated for this long belong to a dead worker
+STALE_AFTER = timedelta(minutes=5)
+
+
+def drop_broken_connection():
+    """Close a connection an error left unusable, the next query reconnects."""
+    if connection.connection is not None and not connection.is_usable():
+        connection.close()
+
+
+def prefers_async(request):
+    return "respond-async" in request.headers.get("Prefer", "").lower()
+
+
+def enqueue(request):
+    """Validate the order and queue it, booking is left to the workers."""
+    serializer_class = order_serializer_class(request.data)
+    serializer = serializer_class(data=request.data, context={"request": request})
+    serializer.is_valid(raise_exception=True)
+    return OrderRequest.objects.create(user=request.user, payload=request.data)
+
+
+def claim_batch(batch_size):
+    """Mark up to batch_size pending requests as processing and return them.
+
+    On PostgreSQL concurrent workers skip each other's locked rows, so
+    every request is claimed exactly once.
+    """
+    with transaction.atomic():
+        pending = OrderRequest.objects.filter(status=OrderRequest.Status.PENDING)
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        ids = list(pending.order_by("id").values_list("id", flat=True)[:batch_size])
+        OrderRequest.objects.filter(id__in=ids).update(
+            status=OrderRequest.Status.PROCESSING, updated_at=timezone.now()
+        )
+    return list(OrderRequest.objects.filter(id__in=ids).select_related("user"))
+
+
+def process(order_request):
+    serializer_class = order_serializer_class(order_request.payload)
+    serializer = serializer_class(
+        data=order_request.payload, context={"user": order_request.user}
+    )
+    try:
+        serializer.is_valid(raise_exception=True)
+        order_request.order = serializer.save(user=order_request.user)
+        order_request.status = OrderRequest.Status.DONE
+    except (ValidationError, APIException) as error:
+        order_request.errors = error.detail
+        order_request.status = OrderRequest.Status.FAILED
+    except Exception:
+        # Deadlocks, lost connections and bugs fail this request, not the worker
+        logger.exception("Order request %s failed", order_request.id)
+        drop_broken_connection()
+        order_request.order = None
+        order_request.errors = {"detail": "The order could not be processed."}
+        order_request.status = OrderRequest.Status.FAILED
+    order_request.save(update_fields=["order", "errors", "status", "updated_at"])
+    return order_request
+
+
+def process_batch(batch_size):
+    batch = claim_batch(batch_size)
+    for order_request in batch:
+        try:
+            process(order_request)
+        except Exception:
+            # Not even the failure could be saved, requeue_stale retries it
+            logger.exception("Order request %s left processing", order_request.id)
+            drop_broken_connection()
+    return len(batch)
+
+
+def requeue_stale(older_than):
+    """Return requests of workers that died mid-batch to the queue."""
+    return OrderRequest.objects.filter(
+        status=OrderRequest.Status.PROCESSING,
+        updated_at__lt=timezone.now() - older_than,
+    ).update(status=OrderRequest.Status.PENDING, updated_at=timezone.now())
+
+
+def run_worker(batch_size=50, poll_interval=0.5, once=False):
+    processed = 0
+    next_requeue = 0.0
+    try:
+        while True:
+            try:
+                if time.monotonic() >= next_requeue:
+                    requeue_stale(STALE_AFTER)
+                    next_requeue = time.monotonic() + STALE_AFTER.total_seconds()
+                count = process_batch(batch_size)
+            except Exception:
+                logger.exception("Claiming order requests failed")
+                drop_broken_connection()
+                count = 0
+            processed += count
+            if not count:
+                if once:
+                    return processed
+                time.sleep(poll_interval)
+    finally:
+        connection.close()
+
+
+class AsyncOrderIntakeMixin:
+    """Answer order creation with 202 and a status URL when the client sends
+    ``Prefer: respond-async`` or ORDER_INTAKE_ASYNC is on."""
+
+    def create(self, request, *args, **kwargs):
+        preferred = prefers_async(request)
+        if not (preferred or settings.ORDER_INTAKE_ASYNC):
+            return super().create(request, *args, **kwargs)
+        order_request = enqueue(request)
+        headers = {
+            "Location": reverse("airport:orderrequest-detail", args=[order_request.id])
+        }
+        if preferred:
+            headers["Preference-Applied"] = "respond-async"
+        return Response(
+            OrderRequestSerializer(order_request).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers=headers,
+        )
@@ -0,0 +1,110 @@
+from rest_framework.pagination import (
+    CursorPagination,
+    LimitOffsetPagination,
+    _reverse_ordering,
+)
+
+
+class FlightCursorPagination(CursorPagination):
+    """Keyset pagination over the (departure_time, id) index.
+
+    Cursors are opaque and no total count is computed, so a page costs the
+    same index range scan however deep the client has paged.
+    """
+
+    ordering = ("departure_time", "id")
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class OrderCursorPagination(CursorPagination):
+    """Keyset pagination over the (user, created_at, id) index, newest first."""
+
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class AsyncLimitOffsetPagination(LimitOffsetPagination):
+    """LimitOffsetPagination for async views, queries with the async ORM."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        page = queryset[self.offset : self.offset + self.limit]
+        return [obj async for obj in page.aiterator()]
+
+
+class AsyncFlightCursorPagination(FlightCursorPagination):
+    """FlightCursorPagination for async views, same cursors and links.
+
+    Mirrors CursorPagination.paginate_queryset with the page fetched through
+    aiterator().
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            order = self.ordering[0]
+            lookup = "lt" if self.cursor.reverse != order.startswith("-") else "gt"
+            queryset = queryset.filter(
+                **{f"{order.lstrip('-')}__{lookup}": current_position}
+            )
+
+        # One extra row tells whether a following page exists
+        page = queryset[offset : offset + self.page_size + 1]
+        results = [obj async for obj in page.aiterator()]
+        self.page = results[: self.page_size]
+
+        following_position = None
+        has_following_position = len(results) > len(self.page)
+        if has_following_position:
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+
+        has_current_position = current_position is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = (
+                has_current_position,
+                has_following_position,
+            )
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next, self.has_previous = (
+                has_following_position,
+                has_current_position,
+            )
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
@@ -0,0 +1,159 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import LazyObject, empty
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = "replica-pin:{}"
+
+# Auth state is read through the user cache and the session on every
+# request, a lagging replica there would log users out or cache stale rows
+PRIMARY_MODELS = {settings.AUTH_USER_MODEL, "sessions.Session"}
+
+
+class RequestState:
+    __slots__ = ("request", "pinned", "user_checked", "wrote")
+
+    def __init__(self, request):
+        self.request = request
+        self.pinned = request.method not in SAFE_METHODS
+        self.user_checked = False
+        self.wrote = False
+
+
+_state = ContextVar("replica_request_state", default=None)
+
+
+def request_user(request):
+    """The request's user once authentication resolved it, else None.
+
+    Never forces a lazy user, that would query the database from inside the
+    router.
+    """
+    user = request.__dict__.get("user")
+    if isinstance(user, LazyObject):
+        user = None if user._wrapped is empty else user._wrapped
+    if user is None or not user.is_authenticated:
+        return None
+    return user
+
+
+def reads_from_primary():
+    state = _state.get()
+    if state is None:
+        # Management commands and workers read what they write
+        return True
+    if not state.pinned and not state.user_checked:
+        user = request_user(state.request)
+        if user is not None:
+            state.user_checked = True
+            state.pinned = cache.get(PIN_KEY.format(user.pk)) is not None
+    return state.pinned
+
+
+@contextmanager
+def reading_from_primary():
+    """Send the reads of the block to the primary.
+
+    For filling shared caches and indexes: a build from a lagging replica
+    would be stored under the new generation and served until the next write.
+    """
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    pinned, state.pinned = state.pinned, True
+    try:
+        yield
+    finally:
+        state.pinned = pinned or state.wrote
+
+
+class ReplicaRouter:
+    """Send reads made while serving a request to a random replica.
+
+    Every alias besides "default" is a replica of it. Writes, reads inside a
+    transaction and the reads of users who wrote in the last
+    REPLICA_STICKY_SECONDS go to the primary.
+    """
+
+    def __init__(self):
+        self.replicas = [
+            alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS
+        ]
+
+    def db_for_read(self, model, **hints):
+        if (
+            not self.replicas
+            or model._meta.label in PRIMARY_MODELS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+            or reads_from_primary()
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # All aliases hold the same rows
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaStickinessMiddleware:
+    """Track each request for ReplicaRouter.
+
+    Unsafe methods read from the primary, and a request that wrote pins its
+    user's reads to the primary for REPLICA_STICKY_SECONDS.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestState(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        self.remember_write(state)
+        return response
+
+    async def __acall__(self, request):
+        state = RequestState(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        self.remember_write(state)
+        return response
+
+    @staticmethod
+    def remember_write(state):
+        user = request_user(state.request)
+        if state.wrote and user is not None:
+            cache.set(
+                PIN_KEY.format(user.pk),
+                True,
+                timeout=settings.REPLICA_STICKY_SECONDS,
+            )
@@ -0,0 +1,137 @@
+import datetime
+import heapq
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import NamedTuple
+
+from django.db.models import Q
+
+from airport.cache import KeyedLocalIndex, LocalIndex
+from airport.geo import AirportLocator
+from airport.itineraries import FlightGraph
+from airport.models import Airport, Flight
+
+
+def airport_ids_matching(text: str) -> list[int]:
+    """Return ids of airports whose name or closest big city contains text.
+
+    On PostgreSQL the lookup is answered by the trigram GIN indexes created
+    in migration 0005, elsewhere it is a scan of the (small) airport table.
+    Either way the flight table is never touched.
+    """
+    return list(
+        Airport.objects.filter(
+            Q(name__icontains=text) | Q(closest_big_city__icontains=text)
+        )
+        .order_by()
+        .values_list("id", flat=True)
+    )
+
+
+class Suggestion(NamedTuple):
+    id: int
+    name: str
+    closest_big_city: str
+
+
+class AirportSuggestions:
+    """Prefix index over airport names and cities for autocomplete.
+
+    Every word of a name or city is a key, ranked by where it matched: start
+    of the name, start of the city, then any later word, shorter names
+    first. Results for prefixes of up to PRECOMPUTED characters, the ones
+    matching most airports, are ranked once at build time; longer prefixes
+    bisect the sorted keys and rank the few that match.
+    """
+
+    PRECOMPUTED = 3
+    LIMIT = 10
+
+    def __init__(self, airports):
+        self.airports = {airport.id: airport for airport in airports}
+        entries = []
+        for airport in self.airports.values():
+            for field, text in enumerate((airport.name, airport.closest_big_city)):
+                words = self.words(text)
+                for position in range(len(words)):
+                    kind = field if position == 0 else 2
+                    entries.append(
+                        (
+                            " ".join(words[position:]),
+                            (kind, len(airport.name), airport.name.lower()),
+                            airport.id,
+                        )
+                    )
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.entries = entries
+
+        by_prefix = defaultdict(list)
+        for key, rank, airport_id in entries:
+            for length in range(1, min(len(key), self.PRECOMPUTED) + 1):
+                by_prefix[key[:length]].append((rank, airport_id))
+        self.precomputed = {
+            prefix: self.rank(matches, self.LIMIT)
+            for prefix, matches in by_prefix.items()
+        }
+
+    @staticmethod
+    def words(text):
+        return re.findall(r"\w+", text.lower())
+
+    @staticmethod
+    def rank(matches, limit):
+        best = {}
+        for rank, airport_id in matches:
+            if airport_id not in best or rank < best[airport_id]:
+                best[airport_id] = rank
+        return heapq.nsmallest(
+            limit, best, key=lambda airport_id: (best[airport_id], airport_id)
+        )
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls(
+            Suggestion(*row)
+            for row in queryset.order_by().values_list("id", "name", "closest_big_city")
+        )
+
+    def suggest(self, text, limit=LIMIT):
+        prefix = " ".join(self.words(text))
+        if not prefix:
+            return []
+        if len(prefix) <= self.PRECOMPUTED and limit <= self.LIMIT:
+            ids = self.precomputed.get(prefix, [])[:limit]
+        else:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + "\uffff", start)
+            ids = self.rank(
+                ((rank, airport_id) for _, rank, airport_id in self.entries[start:end]),
+                limit,
+            )
+        return [self.airports[airport_id] for airport_id in ids]
+
+
+# Both are rebuilt in every process after any airport is saved or deleted
+airport_locator = LocalIndex(
+    "airports", lambda: AirportLocator.from_queryset(Airport.objects.all())
+)
+airport_suggestions = LocalIndex(
+    "airports", lambda: AirportSuggestions.from_queryset(Airport.objects.all())
+)
+
+
+def build_flight_graph(window):
+    start, days = window
+    return FlightGraph.from_queryset(
+        Flight.objects.filter(
+            departure_time__gte=start,
+            departure_time__lt=start + datetime.timedelta(days=days),
+        )
+    )
+
+
+# Flight graphs of (first day, number of days) windows, rebuilt after any
+# flight, route or airport write. Seat sales leave them alone.
+flight_graphs = KeyedLocalIndex("flights", build_flight_graph, size=4)
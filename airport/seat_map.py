@@ -0,0 +1,98 @@
+import base64
+import hashlib
+
+from airport.models import SeatHold, Ticket
+
+
+class SeatMap:
+    """Occupancy bitmap of a flight.
+
+    Seat ``(row, seat)`` is bit ``(row - 1) * seats_in_row + (seat - 1)``,
+    most significant bit first within each byte, so a 300-seat airplane
+    fits in 38 bytes. Seats with an active hold count as taken, tickets
+    left outside the airplane after it was resized are ignored.
+    """
+
+    def __init__(self, rows, seats_in_row, taken=()):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.bits = bytearray((rows * seats_in_row + 7) // 8)
+        for row, seat in taken:
+            self.occupy(row, seat)
+
+    @classmethod
+    def for_flight(cls, flight, holder=None):
+        """Seat map of ``flight``, the holds of ``holder`` count as free."""
+        holds = SeatHold.objects.active().filter(flight=flight)
+        if holder is not None:
+            holds = holds.exclude(user=holder)
+        return cls(
+            flight.airplane.rows,
+            flight.airplane.seats_in_row,
+            Ticket.objects.filter(flight=flight)
+            .order_by()
+            .values_list("row", "seat")
+            .union(holds.order_by().values_list("row", "seat")),
+        )
+
+    def _position(self, row, seat):
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index // 8, 0x80 >> (index % 8)
+
+    def occupy(self, row, seat):
+        if not (1 <= row <= self.rows and 1 <= seat <= self.seats_in_row):
+            return
+        byte, mask = self._position(row, seat)
+        self.bits[byte] |= mask
+
+    def is_taken(self, row, seat):
+        byte, mask = self._position(row, seat)
+        return bool(self.bits[byte] & mask)
+
+    def find_seats(self, count, together=True):
+        """Pick ``count`` free seats in one front-to-back pass.
+
+        The first run of ``count`` adjacent free seats within a row wins.
+        Without ``together`` the first free seats are used when no such run
+        exists. Returns a list of ``(row, seat)`` or None if nothing fits.
+        """
+        first_free = []
+        for row in range(1, self.rows + 1):
+            run_start = None
+            for seat in range(1, self.seats_in_row + 1):
+                if self.is_taken(row, seat):
+                    run_start = None
+                    continue
+                if run_start is None:
+                    run_start = seat
+                if seat - run_start + 1 == count:
+                    return [(row, number) for number in range(run_start, seat + 1)]
+                if len(first_free) < count:
+                    first_free.append((row, seat))
+        if not together and len(first_free) == count:
+            return first_free
+        return None
+
+    @property
+    def taken_count(self):
+        return sum(bin(byte).count("1") for byte in self.bits)
+
+    @property
+    def available_count(self):
+        return self.rows * self.seats_in_row - self.taken_count
+
+    def grid(self):
+        return [
+            [int(self.is_taken(row, seat)) for seat in range(1, self.seats_in_row + 1)]
+            for row in range(1, self.rows + 1)
+        ]
+
+    def to_base64(self):
+        return base64.b64encode(self.bits).decode()
+
+    @property
+    def etag(self):
+        digest = hashlib.sha1(
+            f"{self.rows}x{self.seats_in_row}:".encode() + bytes(self.bits)
+        ).hexdigest()
+        return f'"{digest}"'
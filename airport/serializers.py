@@ -1,6 +1,17 @@
-from django.db import transaction
+from collections.abc import Mapping
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from airport.exceptions import SeatConflict
+from airport.geo import haversine_km
+from airport.intervals import Interval, IntervalIndex
 from airport.models import (
     Airport,
     Airplane,
@@ -9,8 +20,13 @@ from airport.models import (
     Route,
     Flight,
     Order,
+    OrderRequest,
+    SeatHold,
     Ticket,
 )
+from airport.seat_map import SeatMap
+from airport.storage import image_storage
+from airport.signals import tickets_bulk_created
 
 
 class AirportSerializer(serializers.ModelSerializer):
@@ -19,6 +35,16 @@ class AirportSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class NearbyAirportSerializer(AirportSerializer):
+    distance = serializers.FloatField(read_only=True, help_text="km")
+
+
+class AirportSuggestionSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    closest_big_city = serializers.CharField(read_only=True)
+
+
 class AirportRouteSerializer(serializers.ModelSerializer):
     airport = serializers.CharField(read_only=True, source="name")
     city = serializers.CharField(read_only=True, source="closest_big_city")
@@ -51,6 +77,7 @@ class AirplaneImageSerializer(serializers.ModelSerializer):
 
 class AirplaneListSerializer(serializers.ModelSerializer):
     airplane_type = serializers.CharField(read_only=True, source="airplane_type.name")
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Airplane
@@ -62,13 +89,53 @@ class AirplaneListSerializer(serializers.ModelSerializer):
             "capacity",
             "airplane_type",
             "image",
+            "image_variants",
         )
 
+    def get_image_variants(self, airplane) -> dict:
+        """URLs of the resized images by size and format, empty until the
+        variants of a fresh upload are rendered"""
+        request = self.context.get("request")
+        urls = {}
+        for size, formats in airplane.image_variants.items():
+            urls[size] = {}
+            for extension, name in formats.items():
+                url = image_storage.url(name)
+                urls[size][extension] = (
+                    request.build_absolute_uri(url) if request else url
+                )
+        return urls
+
 
 class RouteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = "__all__"
+        extra_kwargs = {"distance": {"required": False}}
+
+    def validate(self, attrs):
+        if "distance" not in attrs:
+            source, destination = attrs["source"], attrs["destination"]
+            if None in (
+                source.latitude,
+                source.longitude,
+                destination.latitude,
+                destination.longitude,
+            ):
+                raise serializers.ValidationError(
+                    {"distance": "Required unless both airports have coordinates."}
+                )
+            attrs["distance"] = round(
+                float(
+                    haversine_km(
+                        source.latitude,
+                        source.longitude,
+                        destination.latitude,
+                        destination.longitude,
+                    )
+                )
+            )
+        return attrs
 
 
 class RouteListSerializer(serializers.ModelSerializer):
@@ -103,11 +170,35 @@ class FlightSerializer(serializers.ModelSerializer):
         model = Flight
         fields = "__all__"
 
+    def validate(self, attrs):
+        if self.instance is None:
+            return attrs
+        departure_time = attrs.get("departure_time", self.instance.departure_time)
+        arrival_time = attrs.get("arrival_time", self.instance.arrival_time)
+        # Same half-open overlap as CrewSerializer.validate_flights
+        conflicts = (
+            Crew.flights.through.objects.filter(
+                crew__flights=self.instance,
+                flight__departure_time__lt=arrival_time,
+                flight__arrival_time__gt=departure_time,
+            )
+            .exclude(flight=self.instance)
+            .values_list("crew_id", "flight_id")
+            .order_by("crew_id", "flight_id")
+        )
+        if conflicts:
+            raise serializers.ValidationError(
+                [
+                    f"crew {crew_id} also flies flight {flight_id} at this time"
+                    for crew_id, flight_id in conflicts
+                ]
+            )
+        return attrs
+
 
 class FlightListSerializer(serializers.ModelSerializer):
     route = serializers.StringRelatedField(read_only=True, many=False)
     airplane = serializers.StringRelatedField(read_only=True, many=False)
-    available_seats = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Flight
@@ -126,6 +217,13 @@ class FlightDetailSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    stops = serializers.IntegerField(read_only=True)
+    flights = FlightListSerializer(many=True, read_only=True)
+
+
 class CrewSerializer(serializers.ModelSerializer):
     flights = serializers.PrimaryKeyRelatedField(
         many=True,
@@ -136,23 +234,70 @@ class CrewSerializer(serializers.ModelSerializer):
         model = Crew
         fields = "__all__"
 
+    def validate_flights(self, flights):
+        schedule = IntervalIndex(
+            Interval(flight.departure_time, flight.arrival_time, flight)
+            for flight in flights
+        )
+        conflicts = schedule.conflicts()
+        if conflicts:
+            raise serializers.ValidationError(
+                [
+                    f"flights {first.value.id} and {second.value.id} overlap"
+                    for first, second in conflicts
+                ]
+            )
+        return flights
+
+
+@extend_schema_field(OpenApiTypes.STR)
+class FlightCourseField(serializers.SlugRelatedField):
+    """A flight as the course of its route, e.g. "Kyiv -> Lviv"."""
+
+    def __init__(self, **kwargs):
+        super().__init__(slug_field="route.course", **kwargs)
+
 
 class CrewListSerializer(serializers.ModelSerializer):
-    flights = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="route.course",
-    )
+    """Expects the flights_count annotation and the upcoming_flights
+    prefetch of CrewViewSet, full history is at /crews/{id}/flights/"""
+
+    flights_count = serializers.IntegerField(read_only=True)
+    upcoming_flights = FlightCourseField(many=True, read_only=True)
 
     class Meta:
         model = Crew
-        fields = ("id", "first_name", "last_name", "flights")
+        fields = ("id", "first_name", "last_name", "flights_count", "upcoming_flights")
+
+
+class OrderFlightRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolve flights from the batch preloaded by OrderSerializer."""
+
+    def to_internal_value(self, data):
+        flight = self.context.get("flights", {}).get(str(data))
+        if flight is not None:
+            return flight
+        return super().to_internal_value(data)
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    flight = OrderFlightRelatedField(queryset=Flight.objects.select_related("airplane"))
+
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "flight")
+        # Seat conflicts are checked for the whole order at once
+        validators = []
+
+    def validate(self, attrs):
+        Ticket.validate_ticket(
+            row=attrs["row"],
+            seat=attrs["seat"],
+            airplane=attrs["flight"].airplane,
+            error_to_raise=serializers.ValidationError,
+            held_seats=self.context.get("held_seats", {}).get(attrs["flight"].id, ()),
+        )
+        return attrs
 
 
 class TicketOrderSerializer(serializers.ModelSerializer):
@@ -170,14 +315,250 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ("id", "tickets", "created_at")
 
+    UNIQUE_SEAT_MESSAGE = "The fields row, seat, flight must make a unique set."
+
+    def to_internal_value(self, data):
+        tickets = data.get("tickets") if isinstance(data, Mapping) else None
+        if isinstance(tickets, list):
+            flight_ids = {
+                str(ticket.get("flight"))
+                for ticket in tickets
+                if isinstance(ticket, Mapping)
+            }
+            flight_ids = [pk for pk in flight_ids if pk.isdigit()]
+            self.context["flights"] = {
+                str(flight.id): flight
+                for flight in Flight.objects.select_related("airplane").filter(
+                    id__in=flight_ids
+                )
+            }
+            held_seats = {}
+            for flight_id, row, seat in self.holds_of_others(
+                SeatHold.objects.filter(flight_id__in=flight_ids), self.request_user
+            ):
+                held_seats.setdefault(flight_id, set()).add((row, seat))
+            self.context["held_seats"] = held_seats
+        return super().to_internal_value(data)
+
+    @property
+    def request_user(self):
+        request = self.context.get("request")
+        return request.user if request else self.context.get("user")
+
+    @staticmethod
+    def holds_of_others(queryset, user):
+        queryset = queryset.active()
+        if user is not None and user.is_authenticated:
+            queryset = queryset.exclude(user=user)
+        return queryset.values_list("flight_id", "row", "seat")
+
+    @staticmethod
+    def seats_filter(seats):
+        condition = Q()
+        for flight_id, row, seat in set(seats):
+            condition |= Q(flight_id=flight_id, row=row, seat=seat)
+        return condition
+
+    @classmethod
+    def taken_seats(cls, seats):
+        return set(
+            Ticket.objects.filter(cls.seats_filter(seats)).values_list(
+                "flight_id", "row", "seat"
+            )
+        )
+
+    @staticmethod
+    def seats_of(tickets):
+        return [
+            (ticket["flight"].id, ticket["row"], ticket["seat"]) for ticket in tickets
+        ]
+
+    def validate_tickets(self, tickets):
+        seats = self.seats_of(tickets)
+        taken = self.taken_seats(seats)
+
+        errors, requested = [], set()
+        for seat in seats:
+            if seat in taken or seat in requested:
+                errors.append({"non_field_errors": [self.UNIQUE_SEAT_MESSAGE]})
+            else:
+                errors.append({})
+            requested.add(seat)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return tickets
+
     def create(self, validated_data):
+        ticket_data = validated_data.pop("tickets")
+        return self.book(validated_data, ticket_data)
+
+    @classmethod
+    def book(cls, validated_data, ticket_data):
+        """Create the order and its tickets, 409 for seats taken meanwhile."""
+        seats = cls.seats_of(ticket_data)
+        try:
+            with transaction.atomic():
+                # Concurrent orders for a flight queue up on its row lock.
+                # Locks are always taken in id order, so orders spanning
+                # several flights cannot deadlock each other.
+                list(
+                    Flight.objects.select_for_update()
+                    .filter(id__in={flight_id for flight_id, _, _ in seats})
+                    .order_by("id")
+                    .values_list("id", flat=True)
+                )
+                user = validated_data["user"]
+                unavailable = cls.taken_seats(seats) | set(
+                    cls.holds_of_others(
+                        SeatHold.objects.filter(cls.seats_filter(seats)), user
+                    )
+                )
+                if unavailable:
+                    raise SeatConflict(unavailable)
+
+                order = Order.objects.create(**validated_data)
+                tickets = Ticket.objects.bulk_create(
+                    [Ticket(order=order, **ticket) for ticket in ticket_data]
+                )
+                tickets_bulk_created(tickets)
+                SeatHold.objects.filter(cls.seats_filter(seats), user=user).delete()
+                return order
+        except IntegrityError:
+            raise SeatConflict(set(seats))
+
+
+class AutoSeatOrderSerializer(serializers.Serializer):
+    """Order of ``count`` seats on one flight, assigned by the server."""
+
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+    count = serializers.IntegerField(min_value=1)
+    together = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if attrs["count"] > attrs["flight"].airplane.capacity:
+            raise serializers.ValidationError(
+                {"count": "count exceeds the capacity of the airplane"}
+            )
+        return attrs
+
+    def create(self, validated_data):
+        flight, user = validated_data["flight"], validated_data["user"]
         with transaction.atomic():
-            ticket_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket in ticket_data:
-                Ticket.objects.create(order=order, **ticket)
+            # The flight lock makes assignment and booking one step, so
+            # concurrent group orders never pick the same free seats
+            Flight.objects.select_for_update().filter(id=flight.id).exists()
+            seats = SeatMap.for_flight(flight, holder=user).find_seats(
+                validated_data["count"], validated_data["together"]
+            )
+            if seats is None:
+                raise serializers.ValidationError(
+                    {
+                        "count": f"there are no {validated_data['count']} "
+                        + ("adjacent " if validated_data["together"] else "")
+                        + "free seats on this flight"
+                    }
+                )
+            order = OrderSerializer.book(
+                {"user": user},
+                [{"row": row, "seat": seat, "flight": flight} for row, seat in seats],
+            )
+            # The order replaces the checkout of this flight, holds of
+            # seats that were not assigned are released as well
+            SeatHold.objects.filter(flight=flight, user=user).delete()
             return order
 
+    def to_representation(self, instance):
+        return OrderSerializer(instance, context=self.context).data
+
+
+def order_serializer_class(data):
+    """Serializer for an order payload, explicit tickets or auto-assigned."""
+    if isinstance(data, Mapping) and "tickets" not in data and "count" in data:
+        return AutoSeatOrderSerializer
+    return OrderSerializer
+
+
+class OrderRequestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderRequest
+        fields = ("id", "status", "order", "errors", "created_at", "updated_at")
+        read_only_fields = fields
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
+    class Meta:
+        model = SeatHold
+        fields = ("id", "row", "seat", "flight", "expires_at")
+        read_only_fields = ("expires_at",)
+        # Expired holds of the same seat are replaced in create()
+        validators = []
+
+    def validate(self, attrs):
+        flight, row, seat = attrs["flight"], attrs["row"], attrs["seat"]
+        Ticket.validate_ticket(
+            row=row,
+            seat=seat,
+            airplane=flight.airplane,
+            error_to_raise=serializers.ValidationError,
+            held_seats={
+                (held_row, held_seat)
+                for _, held_row, held_seat in OrderSerializer.holds_of_others(
+                    SeatHold.objects.filter(flight=flight, row=row, seat=seat),
+                    self.context["request"].user,
+                )
+            },
+        )
+        if Ticket.objects.filter(flight=flight, row=row, seat=seat).exists():
+            raise serializers.ValidationError(
+                {"seat": f"seat {seat} in row {row} is already sold"}
+            )
+        return attrs
+
+    def create(self, validated_data):
+        seat = {
+            "flight": validated_data["flight"],
+            "row": validated_data["row"],
+            "seat": validated_data["seat"],
+        }
+        user = validated_data["user"]
+        try:
+            with transaction.atomic():
+                # The flight lock keeps concurrent holds of one customer
+                # from getting past the per-flight cap together
+                Flight.objects.select_for_update().filter(id=seat["flight"].id).exists()
+                SeatHold.objects.expired().filter(**seat).delete()
+                # Holding the seat again keeps the original expiry
+                hold = SeatHold.objects.filter(**seat, user=user).first()
+                if hold is not None:
+                    return hold
+                held = (
+                    SeatHold.objects.active()
+                    .filter(flight=seat["flight"], user=user)
+                    .count()
+                )
+                if held >= settings.SEAT_HOLDS_PER_FLIGHT:
+                    raise serializers.ValidationError(
+                        {
+                            "seat": "at most "
+                            f"{settings.SEAT_HOLDS_PER_FLIGHT} seats "
+                            "can be held on one flight"
+                        }
+                    )
+                return SeatHold.objects.create(
+                    **seat,
+                    user=user,
+                    expires_at=timezone.now()
+                    + timedelta(seconds=settings.SEAT_HOLD_TTL),
+                )
+        except IntegrityError:
+            raise SeatConflict([(seat["flight"].id, seat["row"], seat["seat"])])
+
 
 class OrderListSerializer(serializers.ModelSerializer):
     tickets = TicketOrderSerializer(read_only=True, many=True)
@@ -0,0 +1,102 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from airport.cache import bump_flight_tag, bump_generation
+from airport.images import release, variant_names
+from airport.metrics import count_query
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route, Ticket
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_created(sender, instance, created, **kwargs):
+    if created:
+        Flight.change_available_seats(instance.flight_id, -1)
+        bump_flight_tag(instance.flight_id)
+
+
+def tickets_bulk_created(tickets):
+    """Counterpart of ticket_created for bulk_create, which sends no signals."""
+    for flight_id, count in Counter(ticket.flight_id for ticket in tickets).items():
+        Flight.change_available_seats(flight_id, -count)
+        bump_flight_tag(flight_id)
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, **kwargs):
+    Flight.change_available_seats(instance.flight_id, 1)
+    bump_flight_tag(instance.flight_id)
+    bump_generation("flight-seats")
+
+
+@receiver(post_save, sender=Flight)
+@receiver(post_delete, sender=Flight)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Airplane)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_delete, sender=AirplaneType)
+def flights_changed(sender, **kwargs):
+    bump_generation("flights")
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def airports_changed(sender, **kwargs):
+    bump_generation("airports")
+
+
+def image_blobs(airplane):
+    return [airplane.image.name, *variant_names(airplane.image_variants)]
+
+
+@receiver(pre_save, sender=Airplane)
+def airplane_image_replaced(sender, instance, update_fields=None, **kwargs):
+    """Release the blobs of the previous image once the new one is saved."""
+    if update_fields is not None and not {"image", "image_variants"} & set(
+        update_fields
+    ):
+        return
+    previous = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+    if previous is not None:
+        stale = set(image_blobs(previous)) - set(image_blobs(instance))
+        if stale:
+            transaction.on_commit(lambda: release(stale))
+
+
+@receiver(post_delete, sender=Airplane)
+def airplane_deleted(sender, instance, **kwargs):
+    blobs = image_blobs(instance)
+    transaction.on_commit(lambda: release(blobs))
+
+
+@receiver(pre_save, sender=Airplane)
+def airplane_geometry_loaded(sender, instance, **kwargs):
+    instance._previous_geometry = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("rows", "seats_in_row")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Airplane)
+def airplane_geometry_changed(sender, instance, created, **kwargs):
+    """Recount the flights of an airplane whose capacity changed."""
+    previous = getattr(instance, "_previous_geometry", None)
+    if created or previous in (None, (instance.rows, instance.seats_in_row)):
+        return
+    Flight.recount_available_seats(Flight.objects.filter(airplane=instance))
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
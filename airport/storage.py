@@ -0,0 +1,78 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+import time
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Store every file once, named after the SHA-256 of its content.
+
+    Uploads are hashed while they are streamed to a temporary file, which
+    then becomes ``<directory>/<digest><extension>`` or is dropped when a
+    blob with that digest already exists. A name therefore always refers to
+    the same bytes, so its URL can be cached forever, and deleting it is
+    only safe once nothing references it any more. Reuse refreshes the
+    modification time of the blob, delete_unused() spares recent ones.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The name is replaced by the digest in _save(), clashes are reuse
+        return name
+
+    def _save(self, name, content):
+        directory, filename = posixpath.split(name)
+        _, extension = os.path.splitext(filename)
+        os.makedirs(self.path(directory), exist_ok=True)
+
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(
+            dir=self.path(directory), prefix=".upload-", delete=False
+        ) as temporary:
+            for chunk in content.chunks():
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                digest.update(chunk)
+                temporary.write(chunk)
+
+        name = posixpath.join(directory, digest.hexdigest() + extension.lower())
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary.name, self.file_permissions_mode)
+            # Atomic, a concurrent upload of the same bytes writes the same file
+            os.replace(temporary.name, self.path(name))
+        else:
+            os.remove(temporary.name)
+        return name
+
+    def delete_unused(self, name, min_age):
+        """Delete a blob not saved or reused in the last ``min_age`` seconds.
+
+        The blob is moved aside before it is deleted: a reuse that touched
+        it in the meantime puts it back, one that comes later finds no blob
+        and writes it again.
+        """
+        path = self.path(name)
+        directory, filename = os.path.split(path)
+        moved = os.path.join(directory, f".delete-{filename}")
+        cutoff = time.time() - min_age
+        try:
+            if os.stat(path).st_mtime > cutoff:
+                return False
+            os.rename(path, moved)
+        except FileNotFoundError:
+            return False
+        if os.stat(moved).st_mtime > cutoff:
+            os.replace(moved, path)
+            return False
+        os.remove(moved)
+        return True
+
+
+image_storage = ContentAddressedStorage()
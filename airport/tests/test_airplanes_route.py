@@ -1,14 +1,18 @@
+import io
 import os.path
 import tempfile
 
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from airport.images import record_variants, release, render_variants, variant_names
 from airport.models import AirplaneType, Airplane
+from airport.storage import image_storage
 from airport.serializers import AirplaneListSerializer
 
 AIRPLANE_URL = reverse("airport:airplane-list")
@@ -227,3 +231,146 @@ class AirplaneImageUploadTests(TestCase):
 
         response = self.client.get(AIRPLANE_URL)
         self.assertIn("image", response.data["results"][0].keys())
+
+
+class AirplaneImageVariantTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com", password="test1234"
+        )
+        self.airplane = sample_airplane()
+        self.client.force_authenticate(self.user)
+
+        with tempfile.NamedTemporaryFile(suffix=".png") as ntf:
+            img = Image.new("RGBA", (1200, 600))
+            img.save(ntf, format="PNG")
+            ntf.seek(0)
+            self.client.post(
+                image_upload_url(self.airplane.id), {"image": ntf}, format="multipart"
+            )
+        self.airplane.refresh_from_db()
+
+    def tearDown(self):
+        self.airplane.refresh_from_db()
+        for name in variant_names(self.airplane.image_variants):
+            image_storage.delete(name)
+        self.airplane.image.delete()
+
+    def test_variants_are_resized(self):
+        variants = render_variants(self.airplane.image.name)
+
+        try:
+            self.assertEqual(set(variants), {"thumb", "medium"})
+            with image_storage.open(variants["thumb"]["webp"]) as file:
+                thumb = Image.open(file)
+                self.assertEqual(thumb.format, "WEBP")
+                self.assertEqual(thumb.size, (160, 80))
+            with image_storage.open(variants["medium"]["jpg"]) as file:
+                self.assertEqual(Image.open(file).size, (640, 320))
+        finally:
+            release(variant_names(variants))
+
+    def test_variant_urls_are_shown_on_airplane_detail(self):
+        record_variants(
+            self.airplane.id,
+            self.airplane.image.name,
+            render_variants(self.airplane.image.name),
+        )
+
+        response = self.client.get(AIRPLANE_URL + f"{self.airplane.id}/")
+
+        self.assertTrue(
+            response.data["image_variants"]["thumb"]["webp"].endswith(".webp")
+        )
+
+    @override_settings(IMAGE_BLOB_GRACE=0)
+    def test_variants_of_replaced_image_are_discarded(self):
+        variants = render_variants(self.airplane.image.name)
+
+        self.assertFalse(record_variants(self.airplane.id, "another.png", variants))
+        self.assertFalse(image_storage.exists(variants["thumb"]["webp"]))
+
+    def test_command_renders_missing_variants(self):
+        self.assertEqual(self.airplane.image_variants, {})
+
+        call_command("generate_image_variants", stdout=io.StringIO())
+
+        self.airplane.refresh_from_db()
+        self.assertEqual(set(self.airplane.image_variants), {"thumb", "medium"})
+
+
+class ContentAddressedImageTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com", password="test1234"
+        )
+        self.airplane = sample_airplane()
+        self.other_airplane = sample_airplane(
+            airplane_type=sample_airplane_type(name="other airplane type")
+        )
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        for airplane in Airplane.objects.exclude(image=""):
+            image_storage.delete(airplane.image.name)
+
+    def upload(self, airplane, color):
+        with tempfile.NamedTemporaryFile(suffix=".JPG") as ntf:
+            img = Image.new("RGB", (10, 10), color)
+            img.save(ntf, format="JPEG")
+            ntf.seek(0)
+            self.client.post(
+                image_upload_url(airplane.id), {"image": ntf}, format="multipart"
+            )
+        airplane.refresh_from_db()
+        return airplane.image.name
+
+    def test_identical_images_are_stored_once(self):
+        name = self.upload(self.airplane, "red")
+        files = image_storage.listdir("uploads/images")[1]
+
+        self.assertEqual(self.upload(self.other_airplane, "red"), name)
+        self.assertRegex(name, r"^uploads/images/[0-9a-f]{64}\.jpg$")
+        self.assertEqual(image_storage.listdir("uploads/images")[1], files)
+
+    @override_settings(IMAGE_BLOB_GRACE=0)
+    def test_blob_is_deleted_with_its_last_reference(self):
+        name = self.upload(self.airplane, "red")
+        self.upload(self.other_airplane, "red")
+
+        self.airplane.image = None
+        with self.captureOnCommitCallbacks(execute=True):
+            self.airplane.save()
+        self.assertTrue(image_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_airplane.delete()
+        self.assertFalse(image_storage.exists(name))
+
+    def test_recently_reused_blob_is_kept(self):
+        name = self.upload(self.airplane, "red")
+        os.utime(image_storage.path(name), (0, 0))
+        self.upload(self.other_airplane, "red")
+        Airplane.objects.update(image="")
+
+        release([name])
+        self.assertTrue(image_storage.exists(name))
+
+        with override_settings(IMAGE_BLOB_GRACE=0):
+            release([name])
+        self.assertFalse(image_storage.exists(name))
+
+    def test_command_collects_unreferenced_blobs(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            MEDIA_ROOT=media_root, IMAGE_BLOB_GRACE=0
+        ):
+            kept = self.upload(self.airplane, "red")
+            unused = self.upload(self.other_airplane, "blue")
+            Airplane.objects.filter(id=self.other_airplane.id).update(image="")
+
+            call_command("collect_image_blobs", stdout=io.StringIO())
+
+            self.assertTrue(image_storage.exists(kept))
+            self.assertFalse(image_storage.exists(unused))
@@ -1,13 +1,18 @@
+import random
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from airport.geo import KDTree, chord_length, haversine_km, unit_vector
 from airport.models import Airport
 from airport.serializers import AirportSerializer
 
 AIRPORT_URL = reverse("airport:airport-list")
+NEARBY_URL = reverse("airport:airport-nearby")
+SUGGEST_URL = reverse("airport:airport-suggest")
 
 
 def sample_airport(**params):
@@ -80,3 +85,98 @@ class AdminUserAirplaneTypeTestCase(TestCase):
         data = {"name": "test airport", "closest_big_city": "test big city 3"}
         response = self.client.post(AIRPORT_URL, data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class NearbyAirportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        self.boryspil = sample_airport(
+            name="Boryspil", latitude=50.345, longitude=30.8947
+        )
+        self.chopin = sample_airport(name="Chopin", latitude=52.1657, longitude=20.9671)
+        self.heathrow = sample_airport(
+            name="Heathrow", latitude=51.47, longitude=-0.4543
+        )
+        sample_airport(name="No coordinates")
+        self.client.force_authenticate(self.user)
+
+    def test_nearby_airports_nearest_first(self):
+        response = self.client.get(
+            NEARBY_URL, {"lat": 50.45, "lon": 30.52, "radius": 1000}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [airport["name"] for airport in response.data], ["Boryspil", "Chopin"]
+        )
+        self.assertAlmostEqual(response.data[1]["distance"], 690, delta=10)
+
+    def test_nearby_airports_after_create(self):
+        self.client.get(NEARBY_URL, {"lat": 50.45, "lon": 30.52})
+        sample_airport(name="Zhuliany", latitude=50.4017, longitude=30.4497)
+
+        response = self.client.get(NEARBY_URL, {"lat": 50.45, "lon": 30.52})
+
+        self.assertEqual(
+            [airport["name"] for airport in response.data], ["Zhuliany", "Boryspil"]
+        )
+
+    def test_nearby_airports_invalid_latitude(self):
+        response = self.client.get(NEARBY_URL, {"lat": 91, "lon": 0})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AirportSuggestTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com", password="test1234"
+        )
+        sample_airport(name="Boryspil", closest_big_city="Kyiv")
+        sample_airport(name="Kyiv International", closest_big_city="Kyiv")
+        sample_airport(name="John F. Kennedy", closest_big_city="New York")
+        self.client.force_authenticate(self.user)
+
+    def suggest(self, text):
+        response = self.client.get(SUGGEST_URL, {"q": text})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [airport["name"] for airport in response.data]
+
+    def test_suggestions_ranked_by_match(self):
+        self.assertEqual(self.suggest("ky"), ["Kyiv International", "Boryspil"])
+
+    def test_suggestions_match_later_words(self):
+        self.assertEqual(self.suggest("f. kenn"), ["John F. Kennedy"])
+        self.assertEqual(self.suggest("york"), ["John F. Kennedy"])
+
+    def test_suggestions_include_created_airport(self):
+        self.assertEqual(self.suggest("zhu"), [])
+
+        self.client.post(AIRPORT_URL, {"name": "Zhuliany", "closest_big_city": "Kyiv"})
+
+        self.assertEqual(self.suggest("zhu"), ["Zhuliany"])
+
+
+class KDTreeTestCase(TestCase):
+    def test_within_matches_brute_force(self):
+        rng = random.Random(7)
+        points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(500)]
+        tree = KDTree(
+            (unit_vector(latitude, longitude), index)
+            for index, (latitude, longitude) in enumerate(points)
+        )
+        # Close to the antimeridian, where latitude/longitude boxes break
+        center = (10.0, 179.5)
+
+        found = tree.within(unit_vector(*center), chord_length(2000))
+
+        latitudes, longitudes = zip(*points)
+        distances = haversine_km(*center, latitudes, longitudes)
+        self.assertEqual(
+            sorted(found),
+            [index for index, distance in enumerate(distances) if distance <= 2000],
+        )
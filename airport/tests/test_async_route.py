@@ -0,0 +1,178 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import AirplaneType, Airplane, Route, Airport, Flight, Ticket, Order
+
+ASYNC_FLIGHT_URL = reverse("airport:async-flight-list")
+ASYNC_AIRPORT_URL = reverse("airport:async-airport-list")
+ASYNC_ROUTE_URL = reverse("airport:async-route-list")
+
+
+def async_flight_detail_url(flight_id):
+    return reverse("airport:async-flight-detail", args=[flight_id])
+
+
+def sample_airport(**params):
+    default = {
+        "name": "test airport",
+        "closest_big_city": "test big city",
+    }
+    default.update(params)
+    return Airport.objects.create(**default)
+
+
+def sample_route(**params):
+    default = {
+        "distance": 1000,
+        "source": sample_airport(name="source", closest_big_city="big city 1"),
+        "destination": sample_airport(
+            name="destination", closest_big_city="big city 2"
+        ),
+    }
+    default.update(params)
+    return Route.objects.create(**default)
+
+
+def sample_airplane(**params):
+    default = {
+        "name": "test airplane",
+        "rows": 15,
+        "seats_in_row": 20,
+        "airplane_type": AirplaneType.objects.create(name="test airplane type"),
+    }
+    default.update(params)
+    return Airplane.objects.create(**default)
+
+
+def sample_flight(route, airplane, **params):
+    default = {
+        "route": route,
+        "airplane": airplane,
+        "departure_time": "2025-11-27T14:30:00Z",
+        "arrival_time": "2025-11-27T19:00:00Z",
+    }
+    default.update(params)
+    return Flight.objects.create(**default)
+
+
+class UnauthenticatedAsyncReadTestCase(TestCase):
+    async def test_unauthenticated_flight_list(self):
+        response = await self.async_client.get(ASYNC_FLIGHT_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
+
+
+class AuthenticatedAsyncReadTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.route = sample_route()
+        self.airplane = sample_airplane()
+        self.flights = [
+            sample_flight(
+                self.route,
+                self.airplane,
+                departure_time=f"2025-11-{day}T14:30:00Z",
+                arrival_time=f"2025-11-{day}T19:00:00Z",
+            )
+            for day in range(10, 15)
+        ]
+
+    def tearDown(self):
+        cache.clear()
+
+    async def async_get(self, url, **params):
+        return await self.async_client.get(url, params, headers=self.headers)
+
+    async def sync_get(self, url, **params):
+        return await sync_to_async(self.client.get)(url, params)
+
+    async def test_flight_list_matches_sync_endpoint(self):
+        response = await self.async_get(ASYNC_FLIGHT_URL, page_size=2)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = await self.sync_get(reverse("airport:flight-list"), page_size=2)
+        self.assertEqual(response.json()["results"], expected.json()["results"])
+        self.assertIsNotNone(response.json()["next"])
+
+    async def test_flight_list_follows_cursor(self):
+        seen = []
+        url, params = ASYNC_FLIGHT_URL, {"page_size": 2}
+        while url:
+            response = await self.async_get(url, **params)
+            seen += [flight["id"] for flight in response.json()["results"]]
+            url, params = response.json()["next"], {}
+
+        self.assertEqual(seen, [flight.id for flight in self.flights])
+
+        response = await self.async_get(ASYNC_FLIGHT_URL, page_size=2)
+        response = await self.async_get(response.json()["next"])
+        response = await self.async_get(response.json()["previous"])
+        self.assertEqual(
+            [flight["id"] for flight in response.json()["results"]],
+            [flight.id for flight in self.flights[:2]],
+        )
+
+    async def test_flight_list_filters(self):
+        response = await self.async_get(ASYNC_FLIGHT_URL, departure_time="2025-11-12")
+
+        self.assertEqual(
+            [flight["id"] for flight in response.json()["results"]],
+            [self.flights[2].id],
+        )
+
+    async def test_flight_list_invalid_filter(self):
+        response = await self.async_get(ASYNC_FLIGHT_URL, departure_time="soon")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_flight_detail_matches_sync_endpoint(self):
+        flight = self.flights[0]
+        order = await Order.objects.acreate(user=self.user)
+        await Ticket.objects.acreate(order=order, flight=flight, row=1, seat=2)
+
+        response = await self.async_get(async_flight_detail_url(flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = await self.sync_get(
+            reverse("airport:flight-detail", args=[flight.id])
+        )
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response.json()["taken_seats"], [2])
+
+    async def test_flight_detail_not_found(self):
+        response = await self.async_get(async_flight_detail_url(0))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_airport_and_route_lists_match_sync_endpoints(self):
+        for async_url, sync_url in (
+            (ASYNC_AIRPORT_URL, reverse("airport:airport-list")),
+            (ASYNC_ROUTE_URL, reverse("airport:route-list")),
+        ):
+            response = await self.async_get(async_url, limit=1, offset=1)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            expected = await self.sync_get(sync_url, limit=1, offset=1)
+            self.assertEqual(response.json()["count"], expected.json()["count"])
+            self.assertEqual(response.json()["results"], expected.json()["results"])
+
+    async def test_writes_are_not_allowed(self):
+        self.user.is_staff = True
+        await self.user.asave()
+        response = await self.async_client.post(
+            ASYNC_AIRPORT_URL, {"name": "new"}, headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
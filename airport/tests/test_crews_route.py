@@ -1,13 +1,21 @@
+import datetime
+
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count, Prefetch
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from airport.intervals import Interval, IntervalIndex
 from airport.models import AirplaneType, Airplane, Route, Airport, Flight, Crew
 from airport.serializers import CrewListSerializer
 
 CREW_URL = reverse("airport:crew-list")
+CREW_AVAILABLE_URL = reverse("airport:crew-available")
 
 
 def sample_airplane_type(**params):
@@ -89,6 +97,15 @@ def sample_crew(airplane_type: str = None, **params):
     return crew
 
 
+def crew_list_queryset():
+    upcoming = Flight.objects.filter(departure_time__gte=timezone.now()).order_by(
+        "departure_time", "id"
+    )
+    return Crew.objects.annotate(flights_count=Count("flights")).prefetch_related(
+        Prefetch("flights", queryset=upcoming[:5], to_attr="upcoming_flights")
+    )
+
+
 class UnauthenticatedUserCrewTestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -126,7 +143,7 @@ class AuthenticatedUserCrewTestCase(TestCase):
 
         sample_crew(airplane_type="crew airplane type 3")
         response = self.client.get(CREW_URL)
-        serializer = CrewListSerializer(Crew.objects.all(), many=True)
+        serializer = CrewListSerializer(crew_list_queryset(), many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
@@ -156,7 +173,7 @@ class AdminUserAirplaneTestCase(TestCase):
 
         sample_crew(airplane_type="crew airplane type 3")
         response = self.client.get(CREW_URL)
-        serializer = CrewListSerializer(Crew.objects.all(), many=True)
+        serializer = CrewListSerializer(crew_list_queryset(), many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
@@ -169,3 +186,168 @@ class AdminUserAirplaneTestCase(TestCase):
         }
         response = self.client.post(CREW_URL, data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class CrewScheduleTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com", password="test1234"
+        )
+        self.morning = sample_flight(
+            airplane_type="morning type",
+            departure_time="2025-11-27T08:00:00Z",
+            arrival_time="2025-11-27T10:00:00Z",
+        )
+        self.overlapping = sample_flight(
+            airplane_type="overlapping type",
+            departure_time="2025-11-27T09:30:00Z",
+            arrival_time="2025-11-27T12:00:00Z",
+        )
+        self.overnight = sample_flight(
+            airplane_type="overnight type",
+            departure_time="2025-11-26T20:00:00Z",
+            arrival_time="2025-11-27T06:00:00Z",
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_crew(self, flights):
+        return self.client.post(
+            CREW_URL,
+            {
+                "first_name": "Test crew first name",
+                "last_name": "Test crew last name",
+                "flights": [flight.id for flight in flights],
+            },
+        )
+
+    def test_create_crew_with_overlapping_flights(self):
+        response = self.create_crew([self.morning, self.overlapping])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("flights", response.data)
+        self.assertFalse(Crew.objects.exists())
+
+    def test_create_crew_with_consecutive_flights(self):
+        response = self.create_crew([self.overnight, self.morning])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_update_flight_into_overlap_with_crew_flight(self):
+        crew = sample_crew(flights=self.morning)
+        crew.flights.add(self.overnight)
+
+        response = self.client.patch(
+            reverse("airport:flight-detail", args=[self.overnight.id]),
+            {"arrival_time": "2025-11-27T09:00:00Z"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.overnight.refresh_from_db()
+        self.assertEqual(
+            self.overnight.arrival_time.isoformat(), "2025-11-27T06:00:00+00:00"
+        )
+
+    def test_update_flight_of_other_crew_into_overlap(self):
+        sample_crew(flights=self.morning)
+
+        response = self.client.patch(
+            reverse("airport:flight-detail", args=[self.overnight.id]),
+            {"arrival_time": "2025-11-27T09:00:00Z"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_available_crews(self):
+        morning_crew = sample_crew(flights=self.morning)
+        overnight_crew = sample_crew(flights=self.overnight)
+        free_crew = Crew.objects.create(first_name="Free", last_name="Crew")
+
+        response = self.client.get(
+            CREW_AVAILABLE_URL,
+            {"from": "2025-11-27T05:00:00Z", "to": "2025-11-27T07:00:00Z"},
+        )
+        self.assertEqual(
+            [crew["id"] for crew in response.data["results"]],
+            [morning_crew.id, free_crew.id],
+        )
+
+        response = self.client.get(
+            CREW_AVAILABLE_URL, {"from": "2025-11-28", "to": "2025-11-28"}
+        )
+        self.assertEqual(
+            [crew["id"] for crew in response.data["results"]],
+            [morning_crew.id, overnight_crew.id, free_crew.id],
+        )
+
+    def test_available_crews_require_period(self):
+        response = self.client.get(CREW_AVAILABLE_URL, {"from": "2025-11-27"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CrewFlightsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        airplane = sample_airplane()
+        route = sample_route()
+        now = timezone.now()
+        self.flights = [
+            Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=now + datetime.timedelta(days=days),
+                arrival_time=now + datetime.timedelta(days=days, hours=2),
+            )
+            for days in range(-3, 8)
+        ]
+        self.crew = Crew.objects.create(first_name="Test", last_name="Crew")
+        self.crew.flights.set(self.flights)
+        self.client.force_authenticate(self.user)
+
+    def test_crew_list_counts_flights_and_shows_next_ones(self):
+        response = self.client.get(CREW_URL)
+
+        crew = response.data["results"][0]
+        self.assertEqual(crew["flights_count"], 11)
+        self.assertEqual(len(crew["upcoming_flights"]), 5)
+
+    def test_crew_list_query_count_does_not_grow_with_crews(self):
+        for number in range(5):
+            crew = Crew.objects.create(first_name=f"Crew {number}", last_name="Test")
+            crew.flights.set(self.flights)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(CREW_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 6)
+        self.assertLessEqual(len(queries), 3)
+
+    def test_crew_flights_are_paginated(self):
+        url = reverse("airport:crew-flights", args=[self.crew.id])
+
+        first_page = self.client.get(url, {"page_size": 6})
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual(
+            [flight["id"] for flight in first_page.data["results"]]
+            + [flight["id"] for flight in second_page.data["results"]],
+            [flight.id for flight in self.flights],
+        )
+        self.assertIsNone(second_page.data["next"])
+
+
+class IntervalIndexTestCase(TestCase):
+    def test_conflicts(self):
+        index = IntervalIndex(
+            [Interval(0, 5, "a"), Interval(4, 8, "b"), Interval(8, 9, "c")]
+        )
+
+        self.assertEqual(
+            [(first.value, second.value) for first, second in index.conflicts()],
+            [("a", "b")],
+        )
@@ -1,21 +1,28 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
-from django.db.models import F, Count, Q
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.http import QueryDict
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
 
-from airport.models import AirplaneType, Airplane, Route, Airport, Flight
+from airport.models import AirplaneType, Airplane, Route, Airport, Flight, Order, Ticket
+from airport.cache import bump_generation, flight_list_cache
+from airport.filters import filter_flights
+from airport.search import airport_ids_matching
 from airport.serializers import FlightListSerializer
 
 FLIGHT_URL = reverse("airport:flight-list")
 
 
 def flight_queryset():
-    return Flight.objects.annotate(
-        available_seats=(F("airplane__rows") * F("airplane__seats_in_row"))
-        - Count("tickets")
-    ).order_by("id")
+    return Flight.objects.order_by("departure_time", "id")
 
 
 def sample_airplane_type(**params):
@@ -138,13 +145,7 @@ class AuthenticatedUserFlightTestCase(TestCase):
 
         sample_flight(airplane_type="flight airplane type 3")
         response = self.client.get(FLIGHT_URL)
-        serializer = FlightListSerializer(
-            Flight.objects.annotate(
-                available_seats=(F("airplane__rows") * F("airplane__seats_in_row"))
-                - Count("tickets")
-            ).order_by("id"),
-            many=True,
-        )
+        serializer = FlightListSerializer(flight_queryset(), many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
@@ -294,6 +295,25 @@ class FilterFlightQuerysetTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_airport_filters_compare_airport_ids(self):
+        queryset = filter_flights(
+            Flight.objects.all(), QueryDict("source=barcelona&destination=LONDON")
+        )
+
+        self.assertIn("source_id", str(queryset.query))
+        self.assertNotIn("airport_airport", str(queryset.query))
+        self.assertEqual([flight.route for flight in queryset], [self.route_1])
+
+    def test_airport_ids_match_name_or_city(self):
+        gatwick = sample_airport(name="Gatwick", closest_big_city="London")
+
+        self.assertEqual(
+            sorted(airport_ids_matching("london")),
+            [self.airport_2.id, gatwick.id],
+        )
+        self.assertEqual(airport_ids_matching("GATW"), [gatwick.id])
+        self.assertEqual(len(airport_ids_matching("test airport")), 3)
+
     def test_correct_filter_by_destination(self):
         response = self.client.get(FLIGHT_URL + "?destination=ber")
         serializer = FlightListSerializer(
@@ -325,6 +345,43 @@ class FilterFlightQuerysetTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_filter_by_departure_range(self):
+        response = self.client.get(
+            FLIGHT_URL
+            + "?departure_from=2025-11-01T00:00:00Z&departure_to=2025-12-28T14:30:00Z"
+        )
+        serializer = FlightListSerializer(
+            flight_queryset().filter(
+                departure_time__gte="2025-11-01T00:00:00Z",
+                departure_time__lt="2025-12-28T14:30:00Z",
+            ),
+            many=True,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"], serializer.data)
+
+    def test_filter_by_arrival_range_with_dates(self):
+        response = self.client.get(
+            FLIGHT_URL + "?arrival_from=2024-10-30&arrival_to=2024-11-30"
+        )
+        serializer = FlightListSerializer(
+            flight_queryset().filter(
+                arrival_time__date__gte="2024-10-30",
+                arrival_time__date__lte="2024-11-30",
+            ),
+            many=True,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"], serializer.data)
+
+    def test_filter_by_invalid_departure_time(self):
+        response = self.client.get(FLIGHT_URL + "?departure_time=yesterday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_return_all_flights(self):
         response = self.client.get(FLIGHT_URL)
         serializer = FlightListSerializer(flight_queryset(), many=True)
@@ -344,3 +401,207 @@ class FilterFlightQuerysetTestCase(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
+
+    def test_filter_by_min_available_seats(self):
+        flight = Flight.objects.get(route=self.route_1)
+        order = Order.objects.create(user=self.user)
+        for seat in range(1, 21):
+            Ticket.objects.create(row=1, seat=seat, flight=flight, order=order)
+
+        response = self.client.get(FLIGHT_URL + "?min_available_seats=290")
+        serializer = FlightListSerializer(
+            flight_queryset().filter(available_seats__gte=290), many=True
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"], serializer.data)
+
+    def test_filter_by_invalid_min_available_seats(self):
+        response = self.client.get(FLIGHT_URL + "?min_available_seats=many")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FlightCursorPaginationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        route = sample_route()
+        airplane = sample_airplane()
+        for day in (3, 1, 2, 1, 3):
+            Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=f"2025-11-0{day}T10:00:00Z",
+                arrival_time=f"2025-11-0{day}T14:00:00Z",
+            )
+        self.client.force_authenticate(self.user)
+
+    def test_pages_follow_departure_time_and_id(self):
+        ids = []
+        url = FLIGHT_URL + "?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            ids.extend(flight["id"] for flight in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(ids, list(flight_queryset().values_list("id", flat=True)))
+
+
+class FlightListCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com", password="test1234"
+        )
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=self.user)
+        self.client.force_authenticate(self.user)
+
+    def test_repeated_list_is_served_from_cache(self):
+        url = FLIGHT_URL + "?source=SOURCE"
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(FLIGHT_URL + "?source=source")
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        stats = self.client.get(reverse("airport:flight-cache-stats")).data
+        self.assertEqual(stats, {"hits": 1, "misses": 1})
+
+    def test_sold_ticket_invalidates_listed_flight(self):
+        self.client.get(FLIGHT_URL)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=self.order)
+
+        response = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(response.data["results"][0]["available_seats"], 299)
+
+    def test_released_seat_invalidates_available_seats_filter(self):
+        for seat in range(1, 21):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=self.flight, order=self.order
+            )
+        url = FLIGHT_URL + "?min_available_seats=290"
+        self.assertEqual(self.client.get(url).data["results"], [])
+
+        Ticket.objects.filter(seat__gt=5).delete()
+
+        self.assertEqual(len(self.client.get(url).data["results"]), 1)
+
+    def test_new_flight_invalidates_list(self):
+        self.client.get(FLIGHT_URL)
+        sample_flight(airplane_type="new airplane type")
+
+        response = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_page_raced_by_write_is_not_cached(self):
+        request = Request(APIRequestFactory().get(FLIGHT_URL))
+        data, generations = flight_list_cache.get(request)
+        bump_generation("flights")
+
+        flight_list_cache.set(request, {"results": []}, generations)
+
+        self.assertEqual(flight_list_cache.get(request)[0], None)
+
+    def test_page_raced_by_sale_is_not_cached(self):
+        request = Request(APIRequestFactory().get(FLIGHT_URL))
+        data, generations = flight_list_cache.get(request)
+        page = self.client.get(FLIGHT_URL + "?page_size=10").data
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=self.order)
+
+        flight_list_cache.set(request, page, generations)
+
+        response = self.client.get(FLIGHT_URL)
+        self.assertEqual(response.data["results"][0]["available_seats"], 299)
+
+
+class FlightAvailableSeatsTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=self.user)
+
+    def test_new_flight_has_airplane_capacity_available(self):
+        self.assertEqual(self.flight.available_seats, self.flight.airplane.capacity)
+
+    def test_ticket_create_and_delete_change_available_seats(self):
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.available_seats, 299)
+
+        ticket.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.available_seats, 300)
+
+    def test_flight_save_keeps_sold_tickets(self):
+        stale = Flight.objects.get(pk=self.flight.pk)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=self.order)
+
+        stale.save()
+
+        self.assertEqual(stale.available_seats, 299)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.available_seats, 299)
+
+    def test_airplane_geometry_change_recounts_flights(self):
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=self.order)
+        airplane = self.flight.airplane
+        airplane.rows = 10
+        airplane.save()
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.available_seats, 10 * airplane.seats_in_row - 1)
+
+    def test_recount_available_seats_command(self):
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=self.order)
+        Flight.objects.filter(pk=self.flight.pk).update(available_seats=0)
+
+        call_command("recount_available_seats", stdout=StringIO())
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.available_seats, 299)
+
+
+class FlightIndexUsageTestCase(TestCase):
+    def setUp(self):
+        self.flight = sample_flight()
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def explain(self, query_string):
+        return filter_flights(Flight.objects.all(), QueryDict(query_string)).explain()
+
+    def test_departure_date_uses_departure_index(self):
+        plan = self.explain("departure_time=2025-11-27")
+        self.assertIn("flight_departure_id_idx", plan)
+
+    def test_departure_range_uses_departure_index(self):
+        plan = self.explain(
+            "departure_from=2025-11-01T00:00:00Z&departure_to=2025-12-01"
+        )
+        self.assertIn("flight_departure_id_idx", plan)
+
+    def test_arrival_date_uses_arrival_index(self):
+        plan = self.explain("arrival_time=2024-11-28")
+        self.assertIn("flight_arrival_id_idx", plan)
+
+    def test_route_and_departure_use_composite_index(self):
+        plan = Flight.objects.filter(
+            route=self.flight.route,
+            departure_time__gte="2025-11-27T00:00:00Z",
+            departure_time__lt="2025-11-28T00:00:00Z",
+        ).explain()
+        self.assertIn("flight_route_departure_idx", plan)
@@ -0,0 +1,166 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.itineraries import FlightGraph, Leg
+from airport.models import AirplaneType, Airplane, Route, Airport, Flight
+
+ITINERARY_URL = reverse("airport:itinerary-list")
+
+
+def sample_airplane(**params):
+    default = {
+        "name": "test airplane",
+        "rows": 15,
+        "seats_in_row": 20,
+        "airplane_type": AirplaneType.objects.create(name="test airplane type"),
+    }
+    default.update(params)
+    return Airplane.objects.create(**default)
+
+
+def sample_airport(**params):
+    default = {
+        "name": "test airport",
+        "closest_big_city": "test big city",
+    }
+    default.update(params)
+    return Airport.objects.create(**default)
+
+
+def sample_flight(airplane, source, destination, departure_time, arrival_time):
+    route = Route.objects.create(source=source, destination=destination, distance=500)
+    return Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time=departure_time,
+        arrival_time=arrival_time,
+    )
+
+
+class ItineraryTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        airplane = sample_airplane()
+        kyiv = sample_airport(name="Boryspil", closest_big_city="Kyiv")
+        warsaw = sample_airport(name="Chopin", closest_big_city="Warsaw")
+        berlin = sample_airport(name="Brandenburg", closest_big_city="Berlin")
+        london = sample_airport(name="Heathrow", closest_big_city="London")
+
+        self.direct = sample_flight(
+            airplane, kyiv, london, "2025-11-27T16:00:00Z", "2025-11-27T20:00:00Z"
+        )
+        self.first_leg = sample_flight(
+            airplane, kyiv, warsaw, "2025-11-27T08:00:00Z", "2025-11-27T09:30:00Z"
+        )
+        self.second_leg = sample_flight(
+            airplane, warsaw, london, "2025-11-27T11:00:00Z", "2025-11-27T13:00:00Z"
+        )
+        # Leaves 15 minutes after the Warsaw arrival, too short by default
+        self.tight_leg = sample_flight(
+            airplane, warsaw, berlin, "2025-11-27T09:45:00Z", "2025-11-27T11:00:00Z"
+        )
+        self.berlin_leg = sample_flight(
+            airplane, berlin, london, "2025-11-27T12:00:00Z", "2025-11-27T13:30:00Z"
+        )
+
+        self.client.force_authenticate(self.user)
+
+    def get_flight_ids(self, query_string):
+        response = self.client.get(ITINERARY_URL + query_string)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            [flight["id"] for flight in itinerary["flights"]]
+            for itinerary in response.data
+        ]
+
+    def test_itineraries_ordered_by_arrival(self):
+        flight_ids = self.get_flight_ids("?from=kyiv&to=london&date=2025-11-27")
+
+        self.assertEqual(
+            flight_ids,
+            [[self.first_leg.id, self.second_leg.id], [self.direct.id]],
+        )
+
+    def test_itineraries_without_stops(self):
+        flight_ids = self.get_flight_ids(
+            "?from=kyiv&to=london&date=2025-11-27&max_stops=0"
+        )
+
+        self.assertEqual(flight_ids, [[self.direct.id]])
+
+    def test_itineraries_respect_min_connection(self):
+        tight_itinerary = [self.first_leg.id, self.tight_leg.id, self.berlin_leg.id]
+
+        self.assertNotIn(
+            tight_itinerary,
+            self.get_flight_ids("?from=kyiv&to=london&date=2025-11-27&max_stops=2"),
+        )
+        self.assertIn(
+            tight_itinerary,
+            self.get_flight_ids(
+                "?from=kyiv&to=london&date=2025-11-27&max_stops=2&min_connection=10m"
+            ),
+        )
+
+    def test_itineraries_for_another_date(self):
+        flight_ids = self.get_flight_ids("?from=kyiv&to=london&date=2025-11-28")
+
+        self.assertEqual(flight_ids, [])
+
+    def test_itineraries_require_parameters(self):
+        response = self.client.get(ITINERARY_URL + "?from=kyiv&date=2025-11-27")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_itineraries_reject_long_or_inverted_connections(self):
+        for query_string in (
+            "&max_connection=100000h",
+            "&min_connection=2h&max_connection=1h",
+            "&max_connection=99999999999999h",
+            "&min_connection=" + "9" * 5000 + "m",
+        ):
+            response = self.client.get(
+                ITINERARY_URL + "?from=kyiv&to=london&date=2025-11-27" + query_string
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_flight_graph_is_reused_until_flights_change(self):
+        query_string = "?from=kyiv&to=london&date=2025-11-27&max_stops=0"
+        with CaptureQueriesContext(connection) as first:
+            self.get_flight_ids(query_string)
+        with CaptureQueriesContext(connection) as second:
+            self.get_flight_ids(query_string)
+
+        self.assertEqual(len(second), len(first) - 1)
+
+        self.direct.delete()
+        self.assertEqual(self.get_flight_ids(query_string), [])
+
+
+class FlightGraphTestCase(TestCase):
+    def test_search_respects_connection_window(self):
+        graph = FlightGraph(
+            [
+                Leg(1, 1, 2, 0, 100),
+                Leg(2, 2, 3, 150, 250),
+                Leg(3, 2, 3, 1000, 1100),
+                Leg(4, 2, 3, 120, 200),
+            ]
+        )
+
+        itineraries = graph.search(
+            [1], [3], 0, 10, min_connection=30, max_connection=500
+        )
+
+        self.assertEqual(
+            [[leg.flight_id for leg in itinerary.legs] for itinerary in itineraries],
+            [[1, 2]],
+        )
@@ -0,0 +1,146 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.metrics import registry
+from airport.models import Airport
+
+METRICS_URL = reverse("metrics")
+AIRPORT_URL = reverse("airport:airport-list")
+
+
+def sample_airport(**params):
+    default = {
+        "name": "test airport",
+        "closest_big_city": "test big city",
+    }
+    default.update(params)
+    return Airport.objects.create(**default)
+
+
+def sample_value(text, name, **labels):
+    """Value of the first sample of ``name`` carrying all ``labels``."""
+    for line in text.splitlines():
+        match = re.fullmatch(rf"{name}{{(.*)}} (\S+)", line)
+        if match and all(
+            f'{key}="{value}"' in match[1] for key, value in labels.items()
+        ):
+            return float(match[2])
+    return None
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        sample_airport()
+
+    def tearDown(self):
+        cache.clear()
+        registry.reset()
+
+    def metrics(self):
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        return response.content.decode()
+
+    def test_requests_latency_and_queries_by_route(self):
+        self.client.get(AIRPORT_URL)
+        self.client.get(AIRPORT_URL)
+
+        text = self.metrics()
+        route = {"route": "airport:airport-list", "method": "GET"}
+        self.assertEqual(
+            sample_value(text, "http_requests_total", status=200, **route), 2
+        )
+        self.assertEqual(
+            sample_value(text, "http_request_duration_seconds_count", **route), 2
+        )
+        self.assertEqual(
+            sample_value(
+                text, "http_request_duration_seconds_bucket", le="+Inf", **route
+            ),
+            2,
+        )
+        # A count and a page query per request
+        self.assertEqual(sample_value(text, "db_queries_total", **route), 4)
+        self.assertGreater(
+            sample_value(text, "db_query_duration_seconds_total", **route), 0
+        )
+
+    def test_status_codes_are_separate_series(self):
+        self.client.post(AIRPORT_URL, {"name": "new"})
+
+        text = self.metrics()
+        self.assertEqual(
+            sample_value(
+                text,
+                "http_requests_total",
+                route="airport:airport-list",
+                method="POST",
+                status=403,
+            ),
+            1,
+        )
+
+    def test_unresolved_paths_and_metrics_are_not_recorded(self):
+        self.client.get("/api/airport/no-such-endpoint/")
+        self.metrics()
+
+        text = self.metrics()
+        self.assertNotIn("no-such-endpoint", text)
+        self.assertNotIn('route="metrics"', text)
+
+    def test_snapshots_of_other_processes_are_included(self):
+        self.client.get(AIRPORT_URL)
+        registry.publish(registry.snapshot())
+        own_process = registry.process
+        registry.reset()
+        registry.process = "other:1"
+
+        text = self.metrics()
+
+        self.assertEqual(
+            sample_value(
+                text,
+                "http_requests_total",
+                process=own_process,
+                route="airport:airport-list",
+            ),
+            1,
+        )
+
+    async def test_async_view_queries_are_counted(self):
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        await self.async_client.get(
+            reverse("airport:async-airport-list"), headers=headers
+        )
+
+        response = await self.async_client.get(METRICS_URL)
+        text = response.content.decode()
+        self.assertGreaterEqual(
+            sample_value(text, "db_queries_total", route="airport:async-airport-list"),
+            2,
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_is_required_when_set(self):
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get(
+            METRICS_URL, headers={"Authorization": "Bearer secret"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -1,9 +1,16 @@
+import datetime
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from airport.idempotency import fingerprint
+from airport.order_queue import process_batch, requeue_stale
 from airport.models import (
     AirplaneType,
     Airplane,
@@ -13,8 +20,12 @@ from airport.models import (
     Crew,
     Order,
     Ticket,
+    IdempotencyKey,
+    OrderRequest,
+    SeatHold,
 )
-from airport.serializers import OrderListSerializer
+from airport.exceptions import SeatConflict
+from airport.serializers import OrderListSerializer, OrderSerializer
 
 ORDER_URL = reverse("airport:order-list")
 
@@ -148,6 +159,26 @@ class AuthenticatedUserOrderTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_order_list_is_cursor_paginated_newest_first(self):
+        for _ in range(3):
+            Order.objects.create(user=self.user)
+
+        response = self.client.get(ORDER_URL + "?page_size=2")
+        next_response = self.client.get(response.data["next"])
+        ids = [order["id"] for order in response.data["results"]] + [
+            order["id"] for order in next_response.data["results"]
+        ]
+
+        self.assertNotIn("count", response.data)
+        self.assertEqual(
+            ids,
+            list(
+                Order.objects.filter(user=self.user)
+                .order_by("-created_at", "-id")
+                .values_list("id", flat=True)
+            ),
+        )
+
     def test_authenticated_create_order(self):
         data = {
             "tickets": [
@@ -157,6 +188,17 @@ class AuthenticatedUserOrderTestCase(TestCase):
         response = self.client.post(ORDER_URL, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_create_order_decreases_available_seats(self):
+        data = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 2, "flight": self.flight.id},
+            ]
+        }
+        self.client.post(ORDER_URL, data, format="json")
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.available_seats, self.flight.airplane.capacity - 2)
+
     def test_create_order_with_bought_ticket(self):
         Ticket.objects.create(row=1, seat=1, flight=self.flight, order=self.order)
         data = {
@@ -167,6 +209,56 @@ class AuthenticatedUserOrderTestCase(TestCase):
         response = self.client.post(ORDER_URL, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_order_with_same_seat_twice(self):
+        data = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+            ]
+        }
+        response = self.client.post(ORDER_URL, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["tickets"][1]["non_field_errors"][0],
+            "The fields row, seat, flight must make a unique set.",
+        )
+
+    def test_create_order_query_count_does_not_grow_with_tickets(self):
+        other_flight = sample_flight(airplane_type="Other order type")
+
+        def post_order(seats):
+            data = {
+                "tickets": [
+                    {"row": 2, "seat": seat, "flight": flight.id}
+                    for seat in seats
+                    for flight in (self.flight, other_flight)
+                ]
+            }
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(ORDER_URL, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(post_order([1]), post_order(range(2, 11)))
+
+    def test_seat_booked_after_validation_raises_conflict(self):
+        serializer = OrderSerializer(
+            data={"tickets": [{"row": 3, "seat": 3, "flight": self.flight.id}]},
+            context={},
+        )
+        self.assertTrue(serializer.is_valid())
+        Ticket.objects.create(row=3, seat=3, flight=self.flight, order=self.order)
+
+        with self.assertRaises(SeatConflict) as context:
+            serializer.save(user=self.user)
+
+        self.assertEqual(context.exception.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            context.exception.detail["seats"],
+            [{"flight": self.flight.id, "row": 3, "seat": 3}],
+        )
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+
     def test_create_order_with_ticket_with_no_valid_data(self):
         data = {
             "tickets": [
@@ -175,12 +267,328 @@ class AuthenticatedUserOrderTestCase(TestCase):
         }
         response = self.client.post(ORDER_URL, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["tickets"][0]["row"][0],
+            "row number must be in available range: (1, rows): (1, 15)",
+        )
 
     def test_authenticated_retrieve_order(self):
         response = self.client.get(reverse("airport:order-detail", kwargs={"pk": 1}))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+class IdempotentOrderTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        self.flight = sample_flight(airplane_type="Order type")
+        self.data = {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}
+        self.client.force_authenticate(self.user)
+
+    def post(self, data, key="order-key-1"):
+        return self.client.post(
+            ORDER_URL, data, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.post(self.data)
+        retry = self.post(self.data)
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+
+    def test_key_reused_with_different_request(self):
+        self.post(self.data)
+        data = {"tickets": [{"row": 1, "seat": 2, "flight": self.flight.id}]}
+
+        response = self.post(data)
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_in_flight_duplicate_is_rejected(self):
+        IdempotencyKey.objects.create(
+            user=self.user,
+            key="order-key-1",
+            request_hash=fingerprint(self.data),
+            locked_until="2999-01-01T00:00:00Z",
+            expires_at="2999-01-01T00:00:00Z",
+        )
+
+        response = self.post(self.data)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Order.objects.exists())
+
+    def test_key_of_dead_request_is_taken_over(self):
+        IdempotencyKey.objects.create(
+            user=self.user,
+            key="order-key-1",
+            request_hash=fingerprint(self.data),
+            locked_until="2000-01-01T00:00:00Z",
+            expires_at="2999-01-01T00:00:00Z",
+        )
+
+        response = self.post(self.data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+
+    def test_key_released_by_concurrent_request_is_claimed(self):
+        create = IdempotencyKey.objects.create
+        attempts = []
+
+        def lose_first_attempt(**fields):
+            # To a request that failed and released the key right after
+            attempts.append(fields)
+            if len(attempts) == 1:
+                raise IntegrityError
+            return create(**fields)
+
+        with mock.patch.object(
+            IdempotencyKey.objects, "create", side_effect=lose_first_attempt
+        ):
+            response = self.post(self.data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(IdempotencyKey.objects.get().response_status, 201)
+
+    def test_retry_of_async_order_replays_location(self):
+        first = self.client.post(
+            ORDER_URL,
+            self.data,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="order-key-1",
+            HTTP_PREFER="respond-async",
+        )
+        retry = self.post(self.data)
+
+        self.assertEqual(retry.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(retry["Location"], first["Location"])
+
+    def test_failed_request_releases_key(self):
+        invalid = {"tickets": [{"row": 999, "seat": 1, "flight": self.flight.id}]}
+        self.assertEqual(self.post(invalid).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class AutoSeatOrderTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        airplane = sample_airplane(
+            airplane_type=sample_airplane_type(name="Auto seat type"),
+            rows=2,
+            seats_in_row=4,
+        )
+        self.flight = sample_flight(airplane=airplane)
+        self.client.force_authenticate(self.user)
+
+    def book(self, row, seat):
+        Ticket.objects.create(
+            row=row,
+            seat=seat,
+            flight=self.flight,
+            order=Order.objects.create(user=self.user),
+        )
+
+    def test_seats_are_assigned_together(self):
+        self.book(1, 2)
+
+        response = self.client.post(
+            ORDER_URL, {"flight": self.flight.id, "count": 3}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in response.data["tickets"]],
+            [(2, 1), (2, 2), (2, 3)],
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.available_seats, 4)
+
+    def test_no_adjacent_seats_left(self):
+        self.book(1, 2)
+        self.book(2, 3)
+
+        response = self.client.post(
+            ORDER_URL, {"flight": self.flight.id, "count": 3}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_scattered_seats_when_not_together(self):
+        self.book(1, 2)
+        self.book(2, 3)
+
+        response = self.client.post(
+            ORDER_URL,
+            {"flight": self.flight.id, "count": 3, "together": False},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["tickets"]), 3)
+
+    def test_held_seats_are_skipped(self):
+        SeatHold.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            user=get_user_model().objects.create_user(
+                email="other@gmail.com", password="test1234"
+            ),
+            expires_at="2999-01-01T00:00:00Z",
+        )
+
+        response = self.client.post(
+            ORDER_URL, {"flight": self.flight.id, "count": 2}, format="json"
+        )
+
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in response.data["tickets"]],
+            [(1, 2), (1, 3)],
+        )
+
+    def test_own_held_seats_are_assigned_and_released(self):
+        for seat in (1, 4):
+            SeatHold.objects.create(
+                row=1,
+                seat=seat,
+                flight=self.flight,
+                user=self.user,
+                expires_at="2999-01-01T00:00:00Z",
+            )
+
+        response = self.client.post(
+            ORDER_URL, {"flight": self.flight.id, "count": 2}, format="json"
+        )
+
+        self.assertEqual(
+            [(ticket["row"], ticket["seat"]) for ticket in response.data["tickets"]],
+            [(1, 1), (1, 2)],
+        )
+        self.assertFalse(SeatHold.objects.exists())
+
+
+class AsyncOrderTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        self.flight = sample_flight(airplane_type="Order type")
+        self.data = {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}
+        self.client.force_authenticate(self.user)
+
+    def post_async(self, data):
+        return self.client.post(
+            ORDER_URL, data, format="json", HTTP_PREFER="respond-async"
+        )
+
+    def test_async_order_is_accepted_and_queued(self):
+        response = self.post_async(self.data)
+
+        order_request = OrderRequest.objects.get()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(
+            response["Location"],
+            reverse("airport:orderrequest-detail", args=[order_request.id]),
+        )
+        self.assertEqual(order_request.status, OrderRequest.Status.PENDING)
+        self.assertFalse(Order.objects.exists())
+
+    def test_async_order_is_validated_before_queueing(self):
+        invalid = {"tickets": [{"row": 999, "seat": 1, "flight": self.flight.id}]}
+
+        response = self.post_async(invalid)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OrderRequest.objects.exists())
+
+    def test_worker_books_queued_order(self):
+        self.post_async(self.data)
+
+        self.assertEqual(process_batch(10), 1)
+
+        order_request = OrderRequest.objects.get()
+        self.assertEqual(order_request.status, OrderRequest.Status.DONE)
+        self.assertEqual(order_request.order.user, self.user)
+        self.assertTrue(
+            Ticket.objects.filter(order=order_request.order, row=1, seat=1).exists()
+        )
+
+    def test_worker_stores_errors_of_failed_order(self):
+        self.post_async(self.data)
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            order=Order.objects.create(user=self.user),
+        )
+
+        process_batch(10)
+
+        order_request = OrderRequest.objects.get()
+        self.assertEqual(order_request.status, OrderRequest.Status.FAILED)
+        self.assertIsNone(order_request.order)
+        self.assertTrue(order_request.errors)
+
+    def test_worker_survives_unexpected_errors(self):
+        self.post_async(self.data)
+        self.post_async(self.data)
+
+        with mock.patch(
+            "airport.serializers.OrderSerializer.save",
+            side_effect=[RuntimeError("deadlock"), mock.DEFAULT],
+            autospec=True,
+        ) as save:
+            save.return_value = Order.objects.create(user=self.user)
+            with self.assertLogs("airport.order_queue", level="ERROR"):
+                self.assertEqual(process_batch(10), 2)
+
+        failed, done = OrderRequest.objects.order_by("id")
+        self.assertEqual(failed.status, OrderRequest.Status.FAILED)
+        self.assertTrue(failed.errors)
+        self.assertEqual(done.status, OrderRequest.Status.DONE)
+
+    def test_stale_requests_are_requeued(self):
+        order_request = OrderRequest.objects.create(
+            user=self.user,
+            payload=self.data,
+            status=OrderRequest.Status.PROCESSING,
+        )
+        OrderRequest.objects.filter(id=order_request.id).update(
+            updated_at="2000-01-01T00:00:00Z"
+        )
+
+        self.assertEqual(requeue_stale(datetime.timedelta(minutes=5)), 1)
+        order_request.refresh_from_db()
+        self.assertEqual(order_request.status, OrderRequest.Status.PENDING)
+
+    def test_order_request_status_of_other_user_is_hidden(self):
+        order_request = OrderRequest.objects.create(
+            user=get_user_model().objects.create_user(
+                email="other@gmail.com", password="test1234"
+            ),
+            payload=self.data,
+        )
+
+        response = self.client.get(
+            reverse("airport:orderrequest-detail", args=[order_request.id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
 class AdminUserOrderTestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
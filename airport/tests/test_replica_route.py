@@ -0,0 +1,171 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Airplane, AirplaneType, Airport, Flight, Route
+from airport.replicas import (
+    ReplicaRouter,
+    ReplicaStickinessMiddleware,
+    reading_from_primary,
+)
+
+
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+        self.router.replicas = ["replica"]
+        self.user = get_user_model()(id=1, email="test@gmail.com")
+        self.other_user = get_user_model()(id=2, email="other@gmail.com")
+
+    def tearDown(self):
+        cache.clear()
+
+    def serve(self, method, user=None, write=False, seen=None):
+        """Run a request through the middleware, return the read database."""
+        seen = {} if seen is None else seen
+
+        def view(request):
+            # What DRF does once it authenticated the request
+            request.user = user
+            with reading_from_primary():
+                seen["block"] = self.router.db_for_read(Flight)
+            if write:
+                self.router.db_for_write(Flight)
+            seen["db"] = self.router.db_for_read(Flight)
+            return HttpResponse()
+
+        request = getattr(self.factory, method)("/")
+        ReplicaStickinessMiddleware(view)(request)
+        return seen["db"]
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Flight), "default")
+
+    def test_safe_request_reads_from_replica(self):
+        self.assertEqual(self.serve("get", self.user), "replica")
+
+    def test_unsafe_request_reads_from_primary(self):
+        self.assertEqual(self.serve("post", self.user), "default")
+
+    def test_reading_from_primary_block(self):
+        seen = {}
+        self.assertEqual(self.serve("get", self.user, seen=seen), "replica")
+        self.assertEqual(seen["block"], "default")
+
+    def test_user_model_reads_from_primary(self):
+        self.serve("get")
+        self.assertEqual(self.router.db_for_read(get_user_model()), "default")
+
+    def test_write_sticks_user_to_primary(self):
+        self.serve("post", self.user, write=True)
+
+        self.assertEqual(self.serve("get", self.user), "default")
+        self.assertEqual(self.serve("get", self.other_user), "replica")
+
+    def test_failed_write_does_not_stick(self):
+        self.serve("post", self.user)
+
+        self.assertEqual(self.serve("get", self.user), "replica")
+
+    def test_stickiness_expires(self):
+        self.serve("post", self.user, write=True)
+        cache.delete(f"replica-pin:{self.user.pk}")
+
+        self.assertEqual(self.serve("get", self.user), "replica")
+
+    def test_without_replicas_reads_from_primary(self):
+        self.router.replicas = []
+        self.assertEqual(self.serve("get", self.user), "default")
+
+    def test_only_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate("default", "airport"))
+        self.assertFalse(self.router.allow_migrate("replica", "airport"))
+
+
+REPLICA = "replica"
+
+
+class ReplicaViewTestCase(TransactionTestCase):
+    """Requests served through a replica alias mirroring the test database."""
+
+    # The replica alias only exists once setUpClass() added it
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        connections.settings[REPLICA] = {
+            **connections[DEFAULT_DB_ALIAS].settings_dict,
+            "TEST": {"MIRROR": DEFAULT_DB_ALIAS},
+        }
+        cls.addClassCleanup(cls.remove_replica)
+        super().setUpClass()
+
+    @classmethod
+    def remove_replica(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        replicas = mock.patch.object(router.routers[0], "replicas", [REPLICA])
+        replicas.start()
+        self.addCleanup(replicas.stop)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        route = Route.objects.create(
+            source=Airport.objects.create(name="source", closest_big_city="city 1"),
+            destination=Airport.objects.create(
+                name="destination", closest_big_city="city 2"
+            ),
+            distance=1000,
+        )
+        airplane = Airplane.objects.create(
+            name="test airplane",
+            rows=15,
+            seats_in_row=20,
+            airplane_type=AirplaneType.objects.create(name="test type"),
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time="2025-11-27T14:30:00Z",
+            arrival_time="2025-11-27T19:00:00Z",
+        )
+
+    def get_flights(self):
+        with CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = self.client.get(reverse("airport:flight-list"))
+        return response, [query["sql"] for query in replica.captured_queries]
+
+    def test_flight_list_is_read_from_replica(self):
+        response, replica_queries = self.get_flights()
+
+        self.assertEqual(response.data["results"][0]["id"], self.flight.id)
+        self.assertTrue(any("airport_flight" in sql for sql in replica_queries))
+
+    def test_flight_list_after_write_is_read_from_primary(self):
+        self.client.post(
+            reverse("airport:order-list"),
+            {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+            format="json",
+        )
+
+        response, replica_queries = self.get_flights()
+
+        self.assertEqual(response.data["results"][0]["available_seats"], 299)
+        self.assertEqual(replica_queries, [])
@@ -1,4 +1,7 @@
+import io
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
@@ -157,3 +160,45 @@ class AdminUserRouteTestCase(TestCase):
         serializer = RouteDetailSerializer(Route.objects.get(pk=1), many=False)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
+
+
+class RouteDistanceTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com", password="test1234"
+        )
+        self.kyiv = sample_airport(name="Boryspil", latitude=50.345, longitude=30.8947)
+        self.london = sample_airport(name="Heathrow", latitude=51.47, longitude=-0.4543)
+        self.client.force_authenticate(self.user)
+
+    def test_distance_is_filled_from_coordinates(self):
+        response = self.client.post(
+            ROUTE_URL, {"source": self.kyiv.id, "destination": self.london.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertAlmostEqual(response.data["distance"], 2170, delta=20)
+
+    def test_distance_required_without_coordinates(self):
+        response = self.client.post(
+            ROUTE_URL,
+            {"source": self.kyiv.id, "destination": sample_airport().id},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command_fixes_wrong_distances(self):
+        wrong = Route.objects.create(
+            source=self.kyiv, destination=self.london, distance=100
+        )
+        right = Route.objects.create(
+            source=self.london, destination=self.kyiv, distance=2180
+        )
+
+        call_command("fill_route_distances", "--fix", stdout=io.StringIO())
+
+        wrong.refresh_from_db()
+        right.refresh_from_db()
+        self.assertAlmostEqual(wrong.distance, 2170, delta=20)
+        self.assertEqual(right.distance, 2180)
@@ -0,0 +1,189 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Route,
+    Airport,
+    Flight,
+    Order,
+    SeatHold,
+    Ticket,
+)
+
+SEAT_HOLD_URL = reverse("airport:seathold-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def sample_flight(**params):
+    airplane = Airplane.objects.create(
+        name="test airplane",
+        rows=15,
+        seats_in_row=20,
+        airplane_type=AirplaneType.objects.create(name="test airplane type"),
+    )
+    route = Route.objects.create(
+        source=Airport.objects.create(name="source", closest_big_city="big city 1"),
+        destination=Airport.objects.create(
+            name="destination", closest_big_city="big city 2"
+        ),
+        distance=1000,
+    )
+    default = {
+        "route": route,
+        "airplane": airplane,
+        "departure_time": "2025-11-27T14:30:00Z",
+        "arrival_time": "2025-11-27T19:00:00Z",
+    }
+    default.update(params)
+    return Flight.objects.create(**default)
+
+
+def sample_hold(flight, user, minutes=5, **params):
+    default = {"row": 1, "seat": 1}
+    default.update(params)
+    return SeatHold.objects.create(
+        flight=flight,
+        user=user,
+        expires_at=timezone.now() + timedelta(minutes=minutes),
+        **default,
+    )
+
+
+class UnauthenticatedUserSeatHoldTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.flight = sample_flight()
+
+    def test_unauthenticated_create_hold(self):
+        data = {"flight": self.flight.id, "row": 1, "seat": 1}
+        response = self.client.post(SEAT_HOLD_URL, data)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedUserSeatHoldTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@gmail.com", password="other1234"
+        )
+        self.flight = sample_flight()
+        self.client.force_authenticate(self.user)
+
+    def test_create_hold(self):
+        data = {"flight": self.flight.id, "row": 2, "seat": 3}
+        response = self.client.post(SEAT_HOLD_URL, data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        hold = SeatHold.objects.get(id=response.data["id"])
+        self.assertEqual(hold.user, self.user)
+        self.assertTrue(hold.is_active)
+
+    def test_cannot_hold_seat_held_by_another_customer(self):
+        sample_hold(self.flight, self.other_user)
+
+        data = {"flight": self.flight.id, "row": 1, "seat": 1}
+        response = self.client.post(SEAT_HOLD_URL, data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_hold_is_replaced(self):
+        sample_hold(self.flight, self.other_user, minutes=-1)
+
+        data = {"flight": self.flight.id, "row": 1, "seat": 1}
+        response = self.client.post(SEAT_HOLD_URL, data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_repeated_hold_keeps_expiry(self):
+        hold = sample_hold(self.flight, self.user)
+
+        data = {"flight": self.flight.id, "row": 1, "seat": 1}
+        response = self.client.post(SEAT_HOLD_URL, data)
+
+        self.assertEqual(response.data["id"], hold.id)
+        self.assertEqual(SeatHold.objects.get().expires_at, hold.expires_at)
+
+    @override_settings(SEAT_HOLDS_PER_FLIGHT=2)
+    def test_cannot_hold_more_seats_than_the_cap(self):
+        sample_hold(self.flight, self.user, seat=1)
+        sample_hold(self.flight, self.user, seat=2)
+        sample_hold(self.flight, self.user, minutes=-1, seat=3)
+
+        data = {"flight": self.flight.id, "row": 1, "seat": 4}
+        response = self.client.post(SEAT_HOLD_URL, data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(SeatHold.objects.active().count(), 2)
+
+    def test_cannot_hold_sold_seat(self):
+        order = Order.objects.create(user=self.other_user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        data = {"flight": self.flight.id, "row": 1, "seat": 1}
+        response = self.client.post(SEAT_HOLD_URL, data)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_only_own_active_holds(self):
+        own = sample_hold(self.flight, self.user)
+        sample_hold(self.flight, self.user, minutes=-1, seat=2)
+        sample_hold(self.flight, self.other_user, seat=3)
+
+        response = self.client.get(SEAT_HOLD_URL)
+
+        self.assertEqual([hold["id"] for hold in response.data["results"]], [own.id])
+
+    def test_order_rejects_seat_held_by_another_customer(self):
+        sample_hold(self.flight, self.other_user)
+
+        data = {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}
+        response = self.client.post(ORDER_URL, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_order_consumes_own_hold(self):
+        sample_hold(self.flight, self.user)
+
+        data = {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}
+        response = self.client.post(ORDER_URL, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_seat_map_marks_held_seats(self):
+        sample_hold(self.flight, self.other_user, row=1, seat=2)
+
+        response = self.client.get(
+            reverse("airport:flight-seat-map", args=[self.flight.id])
+        )
+
+        self.assertEqual(response.data["grid"][0][:3], [0, 1, 0])
+
+
+class ExpireSeatHoldsCommandTestCase(TestCase):
+    def test_expire_seat_holds(self):
+        user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        flight = sample_flight()
+        active = sample_hold(flight, user)
+        for seat in range(2, 7):
+            sample_hold(flight, user, minutes=-1, seat=seat)
+
+        call_command("expire_seat_holds", batch_size=2, stdout=StringIO())
+
+        self.assertEqual(list(SeatHold.objects.all()), [active])
@@ -0,0 +1,145 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import AirplaneType, Airplane, Route, Airport, Flight, Order, Ticket
+from airport.seat_map import SeatMap
+
+
+def seat_map_url(flight_id):
+    return reverse("airport:flight-seat-map", args=[flight_id])
+
+
+def sample_flight(**params):
+    airplane = Airplane.objects.create(
+        name="test airplane",
+        rows=3,
+        seats_in_row=4,
+        airplane_type=AirplaneType.objects.create(name="test airplane type"),
+    )
+    route = Route.objects.create(
+        source=Airport.objects.create(name="source", closest_big_city="big city 1"),
+        destination=Airport.objects.create(
+            name="destination", closest_big_city="big city 2"
+        ),
+        distance=1000,
+    )
+    default = {
+        "route": route,
+        "airplane": airplane,
+        "departure_time": "2025-11-27T14:30:00Z",
+        "arrival_time": "2025-11-27T19:00:00Z",
+    }
+    default.update(params)
+    return Flight.objects.create(**default)
+
+
+class UnauthenticatedUserSeatMapTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.flight = sample_flight()
+
+    def test_unauthenticated_seat_map(self):
+        response = self.client.get(seat_map_url(self.flight.id))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AuthenticatedUserSeatMapTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        self.flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=2, flight=self.flight, order=order)
+        Ticket.objects.create(row=3, seat=4, flight=self.flight, order=order)
+        self.client.force_authenticate(self.user)
+
+    def test_seat_map_grid(self):
+        response = self.client.get(seat_map_url(self.flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["available_seats"], 10)
+        self.assertEqual(
+            response.data["grid"], [[0, 1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 1]]
+        )
+
+    def test_seat_map_compact_bitmap(self):
+        response = self.client.get(seat_map_url(self.flight.id) + "?compact=true")
+
+        self.assertNotIn("grid", response.data)
+        self.assertEqual(
+            base64.b64decode(response.data["bitmap"]), bytes([0b01000000, 0b00010000])
+        )
+
+    def test_seat_map_runs_constant_number_of_queries(self):
+        with self.assertNumQueries(2):
+            self.client.get(seat_map_url(self.flight.id))
+
+    def test_seat_map_not_modified(self):
+        etag = self.client.get(seat_map_url(self.flight.id))["ETag"]
+
+        response = self.client.get(
+            seat_map_url(self.flight.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_seat_map_etag_changes_when_seat_is_sold(self):
+        etag = self.client.get(seat_map_url(self.flight.id))["ETag"]
+        Ticket.objects.create(
+            row=2, seat=1, flight=self.flight, order=Order.objects.first()
+        )
+
+        response = self.client.get(
+            seat_map_url(self.flight.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_seat_map_ignores_tickets_outside_resized_airplane(self):
+        airplane = self.flight.airplane
+        airplane.rows, airplane.seats_in_row = 2, 3
+        airplane.save()
+
+        response = self.client.get(seat_map_url(self.flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["grid"], [[0, 1, 0], [0, 0, 0]])
+
+
+class SeatMapFindSeatsTestCase(TestCase):
+    def test_out_of_range_seats_are_ignored(self):
+        seat_map = SeatMap(2, 3, taken=[(1, 4), (3, 1), (0, 1)])
+
+        self.assertEqual(seat_map.taken_count, 0)
+
+    def test_first_adjacent_block_front_to_back(self):
+        seat_map = SeatMap(3, 4, taken=[(1, 2), (2, 1)])
+
+        self.assertEqual(seat_map.find_seats(3), [(2, 2), (2, 3), (2, 4)])
+
+    def test_no_adjacent_block(self):
+        seat_map = SeatMap(2, 4, taken=[(1, 2), (2, 3)])
+
+        self.assertIsNone(seat_map.find_seats(3))
+
+    def test_scattered_seats_when_not_together(self):
+        seat_map = SeatMap(2, 4, taken=[(1, 2), (2, 3)])
+
+        self.assertEqual(
+            seat_map.find_seats(3, together=False), [(1, 1), (1, 3), (1, 4)]
+        )
+
+    def test_not_together_still_prefers_adjacent_block(self):
+        seat_map = SeatMap(2, 4, taken=[(1, 2)])
+
+        self.assertEqual(
+            seat_map.find_seats(3, together=False), [(2, 1), (2, 2), (2, 3)]
+        )
@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from airport.throttling import SlidingWindowRateThrottle
+
+
+class SlidingWindowThrottleTestCase(TestCase):
+    class Throttle(SlidingWindowRateThrottle):
+        rate = "4/min"
+        now = 0
+
+        def get_cache_key(self, request, view):
+            return "throttle:test"
+
+        def timer(self):
+            return self.now
+
+    def setUp(self):
+        cache.clear()
+        self.request = APIRequestFactory().get("/")
+
+    def tearDown(self):
+        cache.clear()
+
+    def allowed(self, now, requests=1):
+        results = []
+        for _ in range(requests):
+            throttle = self.Throttle()
+            throttle.now = now
+            results.append(throttle.allow_request(self.request, None))
+        return results
+
+    def test_limit_within_window(self):
+        self.assertEqual(self.allowed(10, 5), [True, True, True, True, False])
+
+    def test_previous_window_is_weighted(self):
+        self.allowed(50, 4)
+
+        # A quarter into the next window 3/4 of the previous 4 still count
+        self.assertEqual(self.allowed(75, 2), [True, False])
+        # Halfway through only 2 of them do
+        self.assertEqual(self.allowed(90, 2), [True, False])
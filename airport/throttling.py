@@ -0,0 +1,71 @@
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """Sliding window counter kept in atomic cache increments.
+
+    Each client has a counter per fixed window and the previous window's
+    count is weighted by how much of it still overlaps the sliding one. A
+    client costs two integers instead of a timestamp list, and with a shared
+    cache (Redis) the limit holds across all workers.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window, self.elapsed = divmod(now, self.duration)
+        current_key = f"{self.key}:{int(window)}"
+        self.count = self.increment(current_key)
+        self.previous = self.cache.get(f"{self.key}:{int(window) - 1}", 0)
+        if self.estimate(self.count) > self.num_requests:
+            # Rejected requests do not use up the allowance
+            self.cache.decr(current_key)
+            self.count -= 1
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def increment(self, key):
+        while True:
+            # add() is a no-op for an existing counter, incr() is atomic
+            self.cache.add(key, 0, timeout=2 * self.duration)
+            try:
+                return self.cache.incr(key)
+            except ValueError:
+                # Expired between add() and incr()
+                continue
+
+    def estimate(self, count):
+        return self.previous * (1 - self.elapsed / self.duration) + count
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        remaining = self.duration - self.elapsed
+        if not self.previous:
+            return remaining
+        # Seconds until the weighted previous window leaves room for one more
+        excess = self.estimate(self.count + 1) - self.num_requests
+        return min(max(excess * self.duration / self.previous, 0), remaining)
+
+
+class AnonSlidingWindowThrottle(AnonRateThrottle, SlidingWindowRateThrottle):
+    pass
+
+
+class UserSlidingWindowThrottle(UserRateThrottle, SlidingWindowRateThrottle):
+    pass
+
+
+class ScopedSlidingWindowThrottle(ScopedRateThrottle, SlidingWindowRateThrottle):
+    """Extra limit for views that set ``throttle_scope``."""
@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from airport import views
+from airport import async_views, views
 
 router = routers.DefaultRouter()
 router.register("airports", views.AirportViewSet)
@@ -9,11 +9,34 @@ router.register("airplane-types", views.AirplaneTypeViewSet)
 router.register("airplanes", views.AirplaneViewSet)
 router.register("routes", views.RouteViewSet)
 router.register("flights", views.FlightViewSet)
+router.register("itineraries", views.ItineraryViewSet, basename="itinerary")
 router.register("crews", views.CrewViewSet)
 router.register("orders", views.OrderViewSet)
+router.register("order-requests", views.OrderRequestViewSet)
+router.register("seat-holds", views.SeatHoldViewSet)
 
 urlpatterns = [
     path("", include(router.urls)),
+    path(
+        "async/airports/",
+        async_views.AirportListView.as_view(),
+        name="async-airport-list",
+    ),
+    path(
+        "async/routes/",
+        async_views.RouteListView.as_view(),
+        name="async-route-list",
+    ),
+    path(
+        "async/flights/",
+        async_views.FlightListView.as_view(),
+        name="async-flight-list",
+    ),
+    path(
+        "async/flights/<int:pk>/",
+        async_views.FlightDetailView.as_view(),
+        name="async-flight-detail",
+    ),
 ]
 
 app_name = "airport"
@@ -1,7 +1,12 @@
+import datetime
+
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework.decorators import action
-from django.db.models import Count, F, Q, Prefetch
+from rest_framework.exceptions import ValidationError
+from django.db.models import Count, Prefetch
+from django.utils import timezone
+from django.utils.http import parse_etags
 from rest_framework import viewsets, status, mixins
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
@@ -15,9 +20,32 @@ from airport.models import (
     Route,
     Flight,
     Order,
+    OrderRequest,
+    SeatHold,
     Ticket,
 )
 
+from airport.cache import flight_list_cache
+from airport.crew_schedule import available_crews
+from airport.filters import (
+    day_range,
+    filter_flights,
+    parse_duration_param,
+    parse_int_param,
+    parse_float_param,
+    parse_time_param,
+)
+from airport.idempotency import IdempotentCreateMixin
+from airport.images import schedule_variants
+from airport.order_queue import AsyncOrderIntakeMixin
+from airport.pagination import FlightCursorPagination, OrderCursorPagination
+from airport.search import (
+    airport_ids_matching,
+    airport_locator,
+    airport_suggestions,
+    flight_graphs,
+)
+from airport.seat_map import SeatMap
 from airport.serializers import (
     AirportSerializer,
     AirplaneTypeSerializer,
@@ -29,11 +57,17 @@ from airport.serializers import (
     FlightSerializer,
     FlightListSerializer,
     FlightDetailSerializer,
+    ItinerarySerializer,
     CrewSerializer,
     CrewListSerializer,
     OrderSerializer,
     OrderListSerializer,
     AirplaneImageSerializer,
+    SeatHoldSerializer,
+    NearbyAirportSerializer,
+    AirportSuggestionSerializer,
+    OrderRequestSerializer,
+    order_serializer_class,
 )
 
 
@@ -45,6 +79,63 @@ class AirportViewSet(
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
 
+    MAX_NEARBY = 50
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("lat", type=float, description="Latitude", required=True),
+            OpenApiParameter("lon", type=float, description="Longitude", required=True),
+            OpenApiParameter(
+                "radius",
+                type=float,
+                description="Search radius in km (default 100)",
+                required=False,
+            ),
+        ],
+        responses=NearbyAirportSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, pagination_class=None)
+    def nearby(self, request):
+        """Airports within the radius, nearest first"""
+        params = request.query_params
+        for name in ("lat", "lon"):
+            if not params.get(name):
+                raise ValidationError({name: "This parameter is required."})
+        latitude = parse_float_param("lat", params["lat"], -90, 90)
+        longitude = parse_float_param("lon", params["lon"], -180, 180)
+        radius = parse_float_param("radius", params.get("radius", "100"), 0, 20040)
+
+        found = airport_locator.get().nearby(
+            latitude, longitude, radius, self.MAX_NEARBY
+        )
+        airports = Airport.objects.in_bulk([airport_id for airport_id, _ in found])
+        nearby = []
+        for airport_id, distance in found:
+            if airport_id in airports:
+                airport = airports[airport_id]
+                airport.distance = round(distance, 1)
+                nearby.append(airport)
+        return Response(NearbyAirportSerializer(nearby, many=True).data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=str,
+                description="Beginning of an airport name or city word",
+                required=True,
+            ),
+        ],
+        responses=AirportSuggestionSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, pagination_class=None)
+    def suggest(self, request):
+        """Autocomplete airports from an in-memory prefix index"""
+        suggestions = airport_suggestions.get().suggest(
+            request.query_params.get("q", "")
+        )
+        return Response(AirportSuggestionSerializer(suggestions, many=True).data)
+
 
 class AirplaneTypeViewSet(
     GenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin
@@ -71,7 +162,9 @@ class AirplaneViewSet(
         airplane = self.get_object()
         serializer = self.get_serializer(airplane, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            # Variants of the previous image no longer apply
+            airplane = serializer.save(image_variants={})
+            schedule_variants(airplane)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -107,39 +200,10 @@ class FlightViewSet(viewsets.ModelViewSet):
         "airplane",
         "airplane__airplane_type",
     )
+    pagination_class = FlightCursorPagination
 
     def get_queryset(self):
-        queryset = self.queryset
-
-        source = self.request.query_params.get("source")
-        destination = self.request.query_params.get("destination")
-        departure_time = self.request.query_params.get("departure_time")
-        arrival_time = self.request.query_params.get("arrival_time")
-
-        if source:
-            queryset = queryset.filter(
-                Q(route__source__name__icontains=source)
-                | Q(route__source__closest_big_city__icontains=source)
-            )
-
-        if destination:
-            queryset = queryset.filter(
-                Q(route__destination__name__icontains=destination)
-                | Q(route__destination__closest_big_city__icontains=destination)
-            )
-
-        if departure_time:
-            queryset = queryset.filter(departure_time__date=departure_time)
-
-        if arrival_time:
-            queryset = queryset.filter(arrival_time__date=arrival_time)
-
-        if self.action == "list":
-            queryset = queryset.annotate(
-                available_seats=(F("airplane__rows") * F("airplane__seats_in_row"))
-                - Count("tickets")
-            ).order_by("id")
-        return queryset
+        return filter_flights(self.queryset, self.request.query_params)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -174,32 +238,309 @@ class FlightViewSet(viewsets.ModelViewSet):
                 description="Arrival time parameter",
                 required=False,
             ),
+            OpenApiParameter(
+                "departure_from",
+                type=OpenApiTypes.DATETIME,
+                description="Departure time lower bound, inclusive",
+                required=False,
+            ),
+            OpenApiParameter(
+                "departure_to",
+                type=OpenApiTypes.DATETIME,
+                description="Departure time upper bound, exclusive "
+                "(a date includes the whole day)",
+                required=False,
+            ),
+            OpenApiParameter(
+                "arrival_from",
+                type=OpenApiTypes.DATETIME,
+                description="Arrival time lower bound, inclusive",
+                required=False,
+            ),
+            OpenApiParameter(
+                "arrival_to",
+                type=OpenApiTypes.DATETIME,
+                description="Arrival time upper bound, exclusive "
+                "(a date includes the whole day)",
+                required=False,
+            ),
+            OpenApiParameter(
+                "min_available_seats",
+                type=OpenApiTypes.INT,
+                description="Minimum number of available seats",
+                required=False,
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         """You can filter queryset by source,
-        destination, departure and arrival time"""
-        return super().list(request, *args, **kwargs)
+        destination, departure and arrival time or time range
+        and minimum number of available seats"""
+        data, generations = flight_list_cache.get(request)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        flight_list_cache.set(request, response.data, generations)
+        return response
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "compact",
+                type=OpenApiTypes.BOOL,
+                description="Return only the base64 bitmap, without the grid",
+                required=False,
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=True, url_path="seat-map")
+    def seat_map(self, request, pk=None):
+        """Occupancy of every seat: grid[row - 1][seat - 1] is 1 when taken.
+        The bitmap packs the same grid row by row, most significant bit first.
+        Send the ETag back in If-None-Match to get 304 while nothing changed"""
+        flight = self.get_object()
+        seat_map = SeatMap.for_flight(flight)
+        if seat_map.etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": seat_map.etag}
+            )
 
-class CrewViewSet(GenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin):
-    queryset = Crew.objects.prefetch_related(
-        Prefetch(
-            "flights",
-            queryset=Flight.objects.select_related(
-                "route__source", "route__destination"
+        data = {
+            "flight": flight.id,
+            "rows": seat_map.rows,
+            "seats_in_row": seat_map.seats_in_row,
+            "available_seats": seat_map.available_count,
+            "bitmap": seat_map.to_base64(),
+        }
+        if request.query_params.get("compact") not in ("1", "true"):
+            data["grid"] = seat_map.grid()
+        return Response(data, headers={"ETag": seat_map.etag})
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[IsAdminUser],
+        url_path="cache-stats",
+    )
+    def cache_stats(self, request):
+        return Response(flight_list_cache.stats())
+
+
+class ItineraryViewSet(GenericViewSet):
+    queryset = Flight.objects.select_related(
+        "route__source",
+        "route__destination",
+        "airplane__airplane_type",
+    )
+    serializer_class = ItinerarySerializer
+    pagination_class = None
+
+    MAX_STOPS = 3
+    MAX_RESULTS = 20
+    MAX_CONNECTION = datetime.timedelta(hours=24)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=str,
+                description="Source airport name or city",
+                required=True,
             ),
-        )
+            OpenApiParameter(
+                "to",
+                type=str,
+                description="Destination airport name or city",
+                required=True,
+            ),
+            OpenApiParameter(
+                "date",
+                type=OpenApiTypes.DATE,
+                description="Departure date of the first flight",
+                required=True,
+            ),
+            OpenApiParameter(
+                "max_stops",
+                type=OpenApiTypes.INT,
+                description="Maximum number of connections (default 1, up to 3)",
+                required=False,
+            ),
+            OpenApiParameter(
+                "min_connection",
+                type=str,
+                description="Minimum connection time, e.g. 45m (default)",
+                required=False,
+            ),
+            OpenApiParameter(
+                "max_connection",
+                type=str,
+                description="Maximum connection time, e.g. 6h (default), " "up to 24h",
+                required=False,
+            ),
+        ]
     )
+    def list(self, request, *args, **kwargs):
+        """Direct and connecting flights between two airports,
+        earliest arrival first"""
+        params = request.query_params
+        for name in ("from", "to", "date"):
+            if not params.get(name):
+                raise ValidationError({name: "This parameter is required."})
+
+        start, end = day_range("date", params["date"])
+        max_stops = parse_int_param("max_stops", params.get("max_stops", "1"))
+        if not 0 <= max_stops <= self.MAX_STOPS:
+            raise ValidationError(
+                {"max_stops": f"max_stops must be between 0 and {self.MAX_STOPS}."}
+            )
+        min_connection = parse_duration_param(
+            "min_connection", params.get("min_connection", "45m")
+        )
+        max_connection = parse_duration_param(
+            "max_connection", params.get("max_connection", "6h")
+        )
+        if max_connection > self.MAX_CONNECTION:
+            raise ValidationError(
+                {"max_connection": "max_connection must be at most 24h."}
+            )
+        if min_connection > max_connection:
+            raise ValidationError(
+                {"min_connection": "min_connection must not exceed max_connection."}
+            )
+
+        sources = airport_ids_matching(params["from"])
+        destinations = airport_ids_matching(params["to"])
+        if not sources or not destinations:
+            return Response([])
+
+        # Later legs may leave up to a day of flying plus the longest
+        # connection after the previous one. Windows are whole days, so
+        # searches of the same date share the cached graph.
+        horizon = end + max_stops * (max_connection + datetime.timedelta(days=1))
+        days = -((start - horizon) // datetime.timedelta(days=1))
+        graph = flight_graphs.get((start, days))
+        itineraries = graph.search(
+            sources,
+            destinations,
+            start.timestamp(),
+            end.timestamp(),
+            max_stops=max_stops,
+            min_connection=min_connection.total_seconds(),
+            max_connection=max_connection.total_seconds(),
+            limit=self.MAX_RESULTS,
+        )
+
+        flights = self.get_queryset().in_bulk(
+            {leg.flight_id for itinerary in itineraries for leg in itinerary.legs}
+        )
+        chains = [
+            [flights[leg.flight_id] for leg in itinerary.legs]
+            for itinerary in itineraries
+        ]
+        serializer = self.get_serializer(
+            [
+                {
+                    "departure_time": chain[0].departure_time,
+                    "arrival_time": chain[-1].arrival_time,
+                    "stops": len(chain) - 1,
+                    "flights": chain,
+                }
+                for chain in chains
+            ],
+            many=True,
+        )
+        return Response(serializer.data)
+
+
+class CrewViewSet(GenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin):
+    queryset = Crew.objects.all()
+    UPCOMING_FLIGHTS = 5
+
     serializer_class = CrewSerializer
 
+    def get_queryset(self):
+        if self.action not in ("list", "available"):
+            return self.queryset
+        # The slice becomes a ROW_NUMBER() window per crew member, so the
+        # prefetch loads at most UPCOMING_FLIGHTS rows for each of them
+        upcoming = (
+            Flight.objects.select_related("route__source", "route__destination")
+            .filter(departure_time__gte=timezone.now())
+            .order_by("departure_time", "id")
+        )
+        return self.queryset.annotate(flights_count=Count("flights")).prefetch_related(
+            Prefetch(
+                "flights",
+                queryset=upcoming[: self.UPCOMING_FLIGHTS],
+                to_attr="upcoming_flights",
+            )
+        )
+
     def get_serializer_class(self):
-        if self.action in ("list", "retrieve"):
+        if self.action in ("list", "available"):
             return CrewListSerializer
+        if self.action == "flights":
+            return FlightListSerializer
         return CrewSerializer
 
+    @action(
+        methods=["GET"],
+        detail=True,
+        pagination_class=FlightCursorPagination,
+    )
+    def flights(self, request, pk=None):
+        """Every flight of the crew member, paginated"""
+        crew = self.get_object()
+        page = self.paginate_queryset(
+            crew.flights.select_related(
+                "route__source",
+                "route__destination",
+                "airplane__airplane_type",
+            )
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.DATETIME,
+                description="Start of the period (date or datetime, inclusive)",
+                required=True,
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.DATETIME,
+                description="End of the period (date or datetime, "
+                "a date includes the whole day)",
+                required=True,
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="available")
+    def available(self, request):
+        """Crew members with no flight overlapping the period"""
+        params = request.query_params
+        for name in ("from", "to"):
+            if not params.get(name):
+                raise ValidationError({name: "This parameter is required."})
+        start, _ = parse_time_param("from", params["from"])
+        end, is_date = parse_time_param("to", params["to"])
+        if is_date:
+            end += datetime.timedelta(days=1)
+        if end <= start:
+            raise ValidationError({"to": "to must be later than from."})
+
+        queryset = available_crews(start, end, self.get_queryset())
+        page = self.paginate_queryset(queryset.order_by("id"))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 class OrderViewSet(
+    IdempotentCreateMixin,
+    AsyncOrderIntakeMixin,
     GenericViewSet,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -214,6 +555,8 @@ class OrderViewSet(
         )
     )
     permission_classes = (IsAuthenticated,)
+    pagination_class = OrderCursorPagination
+    throttle_scope = "orders"
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user)
@@ -221,7 +564,42 @@ class OrderViewSet(
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
             return OrderListSerializer
+        if self.action == "create":
+            return order_serializer_class(self.request.data)
         return OrderSerializer
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class OrderRequestViewSet(GenericViewSet, mixins.RetrieveModelMixin):
+    """Status of an order sent with Prefer: respond-async"""
+
+    queryset = OrderRequest.objects.all()
+    serializer_class = OrderRequestSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+
+class SeatHoldViewSet(
+    GenericViewSet,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+):
+    """Short-lived reservations of seats during checkout.
+    A hold expires after SEAT_HOLD_TTL seconds and is consumed
+    by an order for the same seat. A customer holds at most
+    SEAT_HOLDS_PER_FLIGHT seats of a flight at once"""
+
+    queryset = SeatHold.objects.select_related("flight")
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.active().filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
@@ -45,12 +45,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "airport.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "airport.replicas.ReplicaStickinessMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -98,6 +100,21 @@ DATABASES = {
     }
 }
 
+# Read replicas as comma separated "host[:port]", e.g. "replica-1,replica-2:5433".
+# Pointing one at POSTGRES_HOST tries the routing against a single server.
+for number, address in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICAS", "").split(",")), start=1
+):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["airport.replicas.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -138,11 +155,33 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = "/files/media"
 
+# Let the front web server send media files: an internal nginx location
+# (X-Accel-Redirect, e.g. "/protected-media/") or X-Sendfile for Apache
+MEDIA_ACCEL_REDIRECT = os.environ.get("MEDIA_ACCEL_REDIRECT", "")
+MEDIA_SENDFILE = os.environ.get("MEDIA_SENDFILE", "").lower() in ("1", "true")
+
 
 # FOR TESTS
 # MEDIA_ROOT = BASE_DIR / "media"
 
 
+# Throttle counters and cached pages must be shared by all workers, the
+# local memory cache is only a stand-in for tests and development
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -150,6 +189,49 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "user.User"
 
+# Seconds a rendered flight list page may be served from cache,
+# writes to flights, routes, airports and tickets invalidate it earlier
+FLIGHT_LIST_CACHE_TIMEOUT = 60
+
+# Seconds a seat stays reserved for a customer after POST /seat-holds/
+SEAT_HOLD_TTL = 300
+
+# Most seats one customer may hold on a flight at the same time
+SEAT_HOLDS_PER_FLIGHT = 10
+
+# Seconds the first response to POST /orders/ with an Idempotency-Key
+# header is replayed for retries of the same request
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+# Seconds a key stays locked by the request it was first sent with; retries
+# after that take it over, e.g. when the server died mid-request
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# Queue every POST /orders/ for the run_order_workers pool, clients can
+# also opt in per request with the "Prefer: respond-async" header
+ORDER_INTAKE_ASYNC = False
+
+# Worker processes resizing uploaded airplane images
+IMAGE_VARIANT_WORKERS = 2
+
+# Seconds an image blob is kept after it was last saved or reused, so that
+# uploads still in their transaction don't lose it; collect_image_blobs
+# deletes the unreferenced ones later
+IMAGE_BLOB_GRACE = 60 * 60
+
+# Seconds safe requests may authenticate with a cached user, saving or
+# deleting the user invalidates it earlier
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Seconds a user's reads stay on the primary after a request of theirs wrote
+REPLICA_STICKY_SECONDS = 10
+
+# Seconds between publishing a process's request metrics for /metrics
+METRICS_FLUSH_INTERVAL = 10
+
+# Bearer token Prometheus has to send to /metrics, open when empty
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
@@ -162,14 +244,17 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "airport.throttling.AnonSlidingWindowThrottle",
+        "airport.throttling.UserSlidingWindowThrottle",
+        "airport.throttling.ScopedSlidingWindowThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/day",
-        "user": "1000/day"
+        "user": "1000/day",
+        "orders": "60/min",
+        "token": "20/min",
     },
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     )
 }
@@ -15,15 +15,16 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from debug_toolbar.toolbar import debug_toolbar_urls
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
     SpectacularRedocView
 )
 
+from airport.media import serve_media
+from airport.metrics import metrics_view
 from airport_api import settings
 
 urlpatterns = [
@@ -37,7 +38,8 @@ urlpatterns = [
     path("api/doc/redoc/",
          SpectacularRedocView.as_view(url_name="schema"),
          name="redoc"),
-] + debug_toolbar_urls() + static(
-    settings.MEDIA_URL,
-    document_root=settings.MEDIA_ROOT
-)
+    path("metrics", metrics_view, name="metrics"),
+    re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.+)$",
+            serve_media,
+            name="media"),
+] + debug_toolbar_urls()
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# Enough for the permission checks and /me/, other fields load on access
+CACHED_FIELDS = ("id", "email", "is_active", "is_staff", "is_superuser")
+
+
+def user_cache_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that keeps the token's user in the cache.
+
+    Safe requests reuse a user loaded at most AUTH_USER_CACHE_TIMEOUT seconds
+    ago and saving or deleting the user drops the entry (user.signals).
+    Unsafe requests always load the user from the database, so updates are
+    never applied to a stale copy. Only CACHED_FIELDS are cached, never the
+    password hash.
+    """
+
+    def authenticate(self, request):
+        self.use_cache = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if not getattr(self, "use_cache", False) or user_id is None:
+            return super().get_user(validated_token)
+
+        key = user_cache_key(user_id)
+        cached = cache.get(key)
+        if cached is None:
+            user = super().get_user(validated_token)
+            cached = {field: getattr(user, field) for field in CACHED_FIELDS}
+            if api_settings.CHECK_REVOKE_TOKEN:
+                cached["revoke_hash"] = get_md5_hash_password(user.password)
+            cache.set(key, cached, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        # from_db() takes the values in model field order
+        fields = [
+            field.attname
+            for field in self.user_model._meta.concrete_fields
+            if field.attname in CACHED_FIELDS
+        ]
+        user = self.user_model.from_db(
+            DEFAULT_DB_ALIAS, fields, [cached[field] for field in fields]
+        )
+        # The same checks as JWTAuthentication.get_user, on the cached copy
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != cached.get("revoke_hash"):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document CachedJWTAuthentication as the jwtAuth bearer scheme."""
+
+    target_class = "user.authentication.CachedJWTAuthentication"
@@ -1,8 +1,12 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import user_cache_key
 
 
 class UnauthenticatedUserMeTestCase(TestCase):
@@ -46,3 +50,50 @@ class AuthenticatedUserMeTestCase(TestCase):
         }
         response = self.client.put(reverse("user:me"), data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CachedTokenUserMeTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@gmail.com",
+            password="test1234"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_get_me_uses_cached_user(self):
+        self.client.get(reverse("user:me"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("user:me"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "testuser@gmail.com")
+        self.assertNotIn("password", cache.get(user_cache_key(self.user.id)))
+
+    def test_put_me_invalidates_cached_user(self):
+        self.client.get(reverse("user:me"))
+        data = {
+            "email": "newemail@gmail.com",
+            "password": "newpassword1234"
+        }
+        self.client.put(reverse("user:me"), data)
+
+        self.assertIsNone(cache.get(user_cache_key(self.user.id)))
+        response = self.client.get(reverse("user:me"))
+        self.assertEqual(response.data["email"], "newemail@gmail.com")
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(reverse("user:me"))
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(reverse("user:me"))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
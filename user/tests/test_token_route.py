@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+TOKEN_URL = reverse("user:login")
+
+
+class TokenThrottleTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        get_user_model().objects.create_user(
+            email="test@gmail.com", password="test1234"
+        )
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_token_requests_are_throttled(self):
+        data = {"email": "test@gmail.com", "password": "wrong"}
+        for _ in range(20):
+            response = self.client.post(TOKEN_URL, data)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(TOKEN_URL, data)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)